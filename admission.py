@@ -0,0 +1,203 @@
+"""
+Admission control and priority load shedding for the main Flask app.
+
+Every /api request is sorted into a priority class:
+
+  0 grade   - grade submissions (POST /api/grade)
+  1 read    - interactive reads and everything else
+  2 bulk    - dashboard polls, analytics and exports
+
+Requests draw from a global token bucket and a per-user bucket, and count
+against a global in-flight limit. Lower classes must leave a reserve of
+tokens in both buckets and of in-flight slots for the classes above them.
+A user's exports therefore cannot spend the tokens their own grade
+submissions need, and under overload dashboards and exports are refused
+with 429 + Retry-After first and grade submissions last.
+"""
+
+import contextlib
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request, session
+
+GRADE, READ, BULK = 0, 1, 2
+CLASS_NAMES = {GRADE: 'grade', READ: 'read', BULK: 'bulk'}
+
+# Fraction of capacity each class must leave untouched for higher classes
+RESERVE = {GRADE: 0.0, READ: 0.2, BULK: 0.5}
+
+# Monitoring must keep answering while the server sheds load
+EXEMPT_PATHS = ('/api/admission-stats',)
+
+BULK_PATHS = (
+    '/api/stats',
+    '/api/grades',
+    '/api/servers',
+    '/api/db-stats',
+    '/api/advanced-analytics',
+    '/api/analytics/',
+    '/api/download-pdf',
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _wait(self, reserve):
+        """Seconds until a token can be taken keeping `reserve`; 0 if one can be taken now"""
+        needed = 1 + reserve * self.capacity
+        return max(0.0, (needed - self.tokens) / self.rate)
+
+    def take(self, reserve=0.0):
+        """Take one token, keeping `reserve` (fraction of capacity) in the bucket.
+
+        Returns (admitted, retry_after_seconds).
+        """
+        return take_all((self,), reserve)
+
+    def is_full(self):
+        with self.lock:
+            self._refill(time.monotonic())
+            return self.tokens >= self.capacity
+
+
+def take_all(buckets, reserve=0.0):
+    """Take one token from every bucket or from none, keeping `reserve` in each.
+
+    All the bucket locks are held while checking and taking, so a refusal by
+    one bucket never spends a token from another. Locks are acquired in the
+    order given; callers always pass the user bucket before the global one.
+    Returns (admitted, retry_after_seconds).
+    """
+    with contextlib.ExitStack() as stack:
+        for bucket in buckets:
+            stack.enter_context(bucket.lock)
+        now = time.monotonic()
+        retry_after = 0.0
+        for bucket in buckets:
+            bucket._refill(now)
+            retry_after = max(retry_after, bucket._wait(reserve))
+        if retry_after:
+            return False, retry_after
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return True, 0.0
+
+
+class AdmissionController:
+    """Global + per-user token buckets with an in-flight limit per priority class"""
+
+    MAX_USER_BUCKETS = 10000
+
+    def __init__(self, global_rate=200, global_burst=400, user_rate=20, user_burst=40, max_inflight=64):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_inflight = max_inflight
+        self.user_buckets = {}
+        self.inflight = 0
+        self.lock = threading.Lock()
+        self.counters = {name: {'admitted': 0, 'shed': 0} for name in CLASS_NAMES.values()}
+
+    @staticmethod
+    def classify(method, path):
+        if method == 'POST' and path == '/api/grade':
+            return GRADE
+        if path.startswith(BULK_PATHS):
+            return BULK
+        return READ
+
+    def _user_bucket(self, key):
+        with self.lock:
+            bucket = self.user_buckets.get(key)
+            if bucket is None:
+                if len(self.user_buckets) >= self.MAX_USER_BUCKETS:
+                    # Idle users have full buckets; dropping them loses nothing
+                    self.user_buckets = {k: b for k, b in self.user_buckets.items() if not b.is_full()}
+                bucket = self.user_buckets[key] = TokenBucket(self.user_rate, self.user_burst)
+            return bucket
+
+    def admit(self, priority, user_key):
+        """Return (admitted, retry_after_seconds) and count the request in flight if admitted"""
+        reserve = RESERVE[priority]
+        name = CLASS_NAMES[priority]
+
+        with self.lock:
+            slots = self.max_inflight * (1 - reserve)
+            if self.inflight >= slots:
+                self.counters[name]['shed'] += 1
+                return False, 1.0
+            self.inflight += 1
+
+        admitted, retry_after = take_all((self._user_bucket(user_key), self.global_bucket), reserve)
+
+        with self.lock:
+            if admitted:
+                self.counters[name]['admitted'] += 1
+            else:
+                self.inflight -= 1
+                self.counters[name]['shed'] += 1
+        return admitted, retry_after
+
+    def release(self):
+        with self.lock:
+            self.inflight -= 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'inflight': self.inflight,
+                'max_inflight': self.max_inflight,
+                'global_tokens': round(self.global_bucket.tokens, 2),
+                'tracked_users': len(self.user_buckets),
+                'classes': {name: dict(c) for name, c in self.counters.items()}
+            }
+
+
+def init_app(app):
+    """Install admission control on every /api request"""
+    controller = AdmissionController(
+        global_rate=float(os.environ.get('ADMISSION_GLOBAL_RATE', '200')),
+        global_burst=float(os.environ.get('ADMISSION_GLOBAL_BURST', '400')),
+        user_rate=float(os.environ.get('ADMISSION_USER_RATE', '20')),
+        user_burst=float(os.environ.get('ADMISSION_USER_BURST', '40')),
+        max_inflight=int(os.environ.get('ADMISSION_MAX_INFLIGHT', '64')),
+    )
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def admission_check():
+        if not request.path.startswith('/api/') or request.method == 'OPTIONS' or request.path in EXEMPT_PATHS:
+            return None
+        priority = controller.classify(request.method, request.path)
+        # Flask-Login keeps the user id in the signed session, so no DB lookup is needed
+        user_key = session.get('_user_id') or request.remote_addr or 'anonymous'
+        admitted, retry_after = controller.admit(priority, user_key)
+        if not admitted:
+            response = jsonify({'error': 'Server busy, please retry shortly'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+            return response
+        g.admitted = True
+        return None
+
+    @app.teardown_request
+    def admission_release(exc=None):
+        if g.pop('admitted', False):
+            controller.release()
+
+    return controller
@@ -0,0 +1,189 @@
+"""
+Monthly archival tiers for grade reports.
+
+Recent reports stay in the grade_reports table. Whole months that fall outside
+the retention window are detached into gzip-compressed JSON-lines files (one
+file per month) and read back by the history API when a query reaches into
+the archived range.
+
+Run:
+  python archive.py            # archive months older than GRADE_RETENTION_MONTHS
+  python archive.py --list     # show archived months
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+from models import db, GradeReport
+
+ARCHIVE_DIR = os.environ.get('GRADE_ARCHIVE_DIR', 'archives')
+RETENTION_MONTHS = int(os.environ.get('GRADE_RETENTION_MONTHS', '6'))
+
+# Keys returned to the API for an archived row (same shape as GradeReport.to_dict)
+RECORD_KEYS = ('id', 'student_name', 'subject', 'score', 'letter_grade', 'feedback', 'gpa', 'created_at')
+
+
+def month_start(dt):
+    """First instant of the month containing dt"""
+    return datetime(dt.year, dt.month, 1)
+
+
+def add_months(dt, months):
+    """Shift a month start by a number of months"""
+    index = dt.year * 12 + (dt.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(dt):
+    """Name of the monthly partition holding dt, e.g. grade_reports_2025_11"""
+    return f"grade_reports_{dt.year:04d}_{dt.month:02d}"
+
+
+def archive_path(period):
+    """Path of the compressed archive file for a month"""
+    return os.path.join(ARCHIVE_DIR, partition_name(period) + '.jsonl.gz')
+
+
+def list_archives():
+    """Return sorted (month_start, path) pairs for every archived month"""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    archives = []
+    for filename in os.listdir(ARCHIVE_DIR):
+        if not (filename.startswith('grade_reports_') and filename.endswith('.jsonl.gz')):
+            continue
+        try:
+            year, month = filename[len('grade_reports_'):-len('.jsonl.gz')].split('_')
+            archives.append((datetime(int(year), int(month), 1), os.path.join(ARCHIVE_DIR, filename)))
+        except ValueError:
+            continue
+    return sorted(archives)
+
+
+def _row_to_archive(report):
+    """Serialize every column of a report so nothing is lost on detach"""
+    row = {}
+    for column in GradeReport.__table__.columns:
+        value = getattr(report, column.name)
+        row[column.name] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
+
+def _read_archive(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_archive(path, rows):
+    """Write rows atomically so a crash never leaves a truncated archive"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, separators=(',', ':')) + '\n')
+    os.replace(tmp_path, path)
+
+
+def detach_month(period):
+    """Move one month of reports from the live table into its archive file.
+
+    Returns the number of rows detached. Rows already archived for the month
+    are kept, so detaching the same month twice only appends late arrivals.
+    The archive is written before the rows are deleted; if the delete fails,
+    a rerun skips rows whose id is already archived instead of appending them
+    again, and the history API drops archived copies of live rows.
+    """
+    start = month_start(period)
+    end = add_months(start, 1)
+    reports = GradeReport.query.filter(
+        GradeReport.created_at >= start,
+        GradeReport.created_at < end
+    ).order_by(GradeReport.created_at).all()
+    if not reports:
+        return 0
+
+    path = archive_path(start)
+    rows = list(_read_archive(path)) if os.path.exists(path) else []
+    archived_ids = {row['id'] for row in rows}
+    new_rows = [_row_to_archive(r) for r in reports if r.id not in archived_ids]
+    if new_rows:
+        rows.extend(new_rows)
+        _write_archive(path, rows)
+
+    try:
+        for report in reports:
+            db.session.delete(report)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(reports)
+
+
+def archive_old_reports(retention_months=RETENTION_MONTHS, now=None):
+    """Detach every month older than the retention window.
+
+    Returns a dict of partition name -> rows detached.
+    """
+    if retention_months < 1:
+        raise ValueError('retention_months must be at least 1')
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    # Only the months that have rows, rather than every month since the oldest one
+    year = db.extract('year', GradeReport.created_at)
+    month = db.extract('month', GradeReport.created_at)
+    months = (db.session.query(year, month)
+              .filter(GradeReport.created_at < cutoff)
+              .group_by(year, month)
+              .order_by(year, month)
+              .all())
+    detached = {}
+    for y, m in months:
+        period = datetime(int(y), int(m), 1)
+        count = detach_month(period)
+        if count:
+            detached[partition_name(period)] = count
+    return detached
+
+
+def iter_archived(start=None, end=None, user_id=None):
+    """Yield archived reports (API record shape) with start <= created_at < end.
+
+    Only the monthly files overlapping the window are opened. When user_id is
+    given, only that teacher's reports are returned.
+    """
+    for period, path in list_archives():
+        if end is not None and period >= end:
+            continue
+        if start is not None and add_months(period, 1) <= month_start(start):
+            continue
+        for row in _read_archive(path):
+            if user_id is not None and row.get('user_id') != user_id:
+                continue
+            created_at = datetime.fromisoformat(row['created_at']) if row.get('created_at') else None
+            if created_at is not None:
+                if start is not None and created_at < start:
+                    continue
+                if end is not None and created_at >= end:
+                    continue
+            record = {key: row.get(key) for key in RECORD_KEYS}
+            record['archived'] = True
+            yield record
+
+
+if __name__ == '__main__':
+    import sys
+    from wed_view import app
+
+    with app.app_context():
+        if '--list' in sys.argv:
+            for period, path in list_archives():
+                print(f"{partition_name(period)}  {path}")
+        else:
+            detached = archive_old_reports()
+            for name, count in detached.items():
+                print(f"Archived {count} reports into {name}")
+            print(f"✅ Archived {sum(detached.values())} reports")
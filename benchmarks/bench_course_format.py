@@ -0,0 +1,112 @@
+"""
+Benchmark the v13 course file against the indented JSON course format.
+
+Builds a synthetic course, then times for each format:
+  save        - GradeCalculator.save_data() / save_json()
+  open        - load_data() / load_json(); the course file reads only its index
+  first       - looking up one student and computing its final grade
+  all         - computing every student's final grade (materializes the rest)
+and records the file sizes. Final grades are checked to match the course
+that was saved.
+
+Needs numpy and matplotlib, which "test grader v13.0.0.py" imports.
+
+Run:
+  python benchmarks/bench_course_format.py                  # 20,000 students
+  python benchmarks/bench_course_format.py --students 200000 --assignments 20
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+CATEGORIES = (('Homework', 30), ('Quizzes', 20), ('Midterm', 25), ('Final', 25))
+
+
+def load_v13():
+    spec = importlib.util.spec_from_file_location('grader_v13', os.path.join(REPO_ROOT, 'test grader v13.0.0.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_course(v13, students, assignments, seed):
+    rng = random.Random(seed)
+    calc = v13.GradeCalculator('Benchmark Course')
+    for i in range(students):
+        student = v13.Student(f'Student {i}', f'S{i:07d}')
+        for name, weight in CATEGORIES:
+            category = v13.GradeCategory(name, weight)
+            for j in range(assignments):
+                category.add_assignment(f'{name} {j + 1}', round(rng.uniform(40, 100), 1), 100)
+            student.add_category(category)
+        calc.add_student(student)
+    return calc
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, round(time.perf_counter() - start, 4)
+
+
+def measure(v13, load, probe_id, expected):
+    """Open a fresh calculator with load(calc) and time the reads"""
+    calc = v13.GradeCalculator('Benchmark Course')
+    _, open_seconds = timed(lambda: load(calc))
+    _, first_seconds = timed(lambda: calc.students[probe_id].calculate_final_grade())
+    grades, all_seconds = timed(lambda: {sid: s.calculate_final_grade() for sid, s in calc.students.items()})
+    return {
+        'open_seconds': open_seconds,
+        'first_student_seconds': first_seconds,
+        'all_students_seconds': all_seconds,
+        'matches': grades == expected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=20_000)
+    parser.add_argument('--assignments', type=int, default=10, help='assignments per category')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    try:
+        v13 = load_v13()
+    except ImportError as e:
+        sys.exit(f'❌ {e.name} is not installed')
+
+    calc = build_course(v13, args.students, args.assignments, args.seed)
+    expected = {sid: s.calculate_final_grade() for sid, s in calc.students.items()}
+    probe_id = f'S{args.students // 2:07d}'
+
+    report = {'students': args.students, 'assignments': args.students * len(CATEGORIES) * args.assignments}
+    cwd = os.getcwd()
+    # The calculator reports each save and load on stdout; keep stdout for the report
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        os.chdir(tmp)
+        try:
+            _, json_save = timed(calc.save_json)
+            _, course_save = timed(calc.save_data)
+            report['json'] = {'save_seconds': json_save, 'bytes': os.path.getsize(calc.json_file),
+                              **measure(v13, lambda c: c.load_json(), probe_id, expected)}
+            report['course'] = {'save_seconds': course_save, 'bytes': os.path.getsize(calc.data_file),
+                                **measure(v13, lambda c: c.load_data(), probe_id, expected)}
+        finally:
+            calc.students.close()
+            os.chdir(cwd)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark every determine_grade implementation and check they agree.
+
+Grading logic is duplicated across the entry points:
+  wed_view       - wed_view.determine_grade
+  grader_server  - grader_server_NNN.determine_grade (generated)
+  v10            - determine_grade_advanced in "test grader v10.0.0.py"
+  v11            - determine_grade_advanced in "test grader v11.0.0.py"
+  v12            - TestGraderV12.determine_grade_advanced
+  v13            - Student.get_letter_grade (skipped when matplotlib/numpy are missing)
+
+Each one is timed on the same random scores, then every implementation is
+checked against wed_view on the grade boundaries (59.99, 60, 62.99, 63, ...,
+96.99, 97). Results are appended to a JSON-lines history file so runs can be
+compared over time.
+
+Run:
+  python benchmarks/bench_determine_grade.py              # 1,000,000 scores
+  python benchmarks/bench_determine_grade.py --n 100000 --strict
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'determine_grade_history.jsonl')
+
+THRESHOLDS = (60, 63, 67, 70, 73, 77, 80, 83, 87, 90, 93, 97)
+
+
+def boundary_scores():
+    """Both sides of every threshold plus the ends of the range"""
+    scores = [0, 100]
+    for t in THRESHOLDS:
+        scores.extend((t - 0.01, t))
+    return sorted(scores)
+
+
+def load_script(name, filename):
+    """Import a repo script by path (several have spaces in their names)"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_implementations(server):
+    """Return {name: letter_grade(score)} plus {name: reason} for skipped ones.
+
+    Each callable is the real implementation; the wrappers only pick the
+    letter out of whatever the implementation returns.
+    """
+    impls, skipped = {}, {}
+
+    # wed_view needs a database URI at import time; nothing is queried here
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    wed_view = load_script('wed_view', 'wed_view.py')
+    impls['wed_view'] = wed_view.determine_grade
+
+    grader = load_script(f'grader_server_{server:03d}', f'grader_server_{server:03d}.py')
+    impls['grader_server'] = grader.determine_grade
+
+    impls['v10'] = load_script('grader_v10', 'test grader v10.0.0.py').determine_grade_advanced
+    impls['v11'] = load_script('grader_v11', 'test grader v11.0.0.py').determine_grade_advanced
+    impls['v12'] = load_script('grader_v12', 'test grader v12.0.0.py').TestGraderV12().determine_grade_advanced
+
+    try:
+        v13 = load_script('grader_v13', 'test grader v13.0.0.py')
+    except ImportError as e:
+        skipped['v13'] = f'{e.name} is not installed'
+    else:
+        class PinnedStudent(v13.Student):
+            """Student whose final grade is set directly, so only the letter lookup is timed"""
+            score = 0.0
+
+            def calculate_final_grade(self):
+                return self.score
+
+        student = PinnedStudent('Benchmark', 'B-1')
+
+        def v13_letter(score):
+            student.score = score
+            return student.get_letter_grade()
+
+        impls['v13'] = v13_letter
+
+    return impls, skipped
+
+
+def letter_of(result):
+    return result if isinstance(result, str) else result[0]
+
+
+def time_implementation(func, scores, repeat):
+    """Best of `repeat` passes over scores, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for score in scores:
+            func(score)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=1_000_000, help='number of random scores')
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes per implementation (best is kept)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--server', type=int, default=1, help='which grader_server_NNN.py to load')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON-lines file results are appended to')
+    parser.add_argument('--no-history', action='store_true', help='do not record this run')
+    parser.add_argument('--strict', action='store_true', help='exit non-zero if any implementation disagrees')
+    args = parser.parse_args()
+
+    impls, skipped = load_implementations(args.server)
+
+    rng = random.Random(args.seed)
+    scores = [round(rng.uniform(0, 100), 2) for _ in range(args.n)]
+
+    # Loop and call overhead, so the per-call numbers can be read net of it
+    overhead = time_implementation(lambda score: None, scores, args.repeat)
+
+    timings = {}
+    for name, func in impls.items():
+        seconds = time_implementation(func, scores, args.repeat)
+        timings[name] = {
+            'seconds': round(seconds, 4),
+            'ns_per_call': round(seconds / args.n * 1e9, 1),
+            'net_ns_per_call': round(max(0.0, seconds - overhead) / args.n * 1e9, 1),
+        }
+
+    reference = impls['wed_view']
+    disagreements = {}
+    for name, func in impls.items():
+        for score in boundary_scores():
+            expected, actual = letter_of(reference(score)), letter_of(func(score))
+            if expected != actual:
+                disagreements.setdefault(name, []).append(
+                    {'score': score, 'expected': expected, 'actual': actual})
+
+    report = {
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'n': args.n,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'overhead_ns_per_call': round(overhead / args.n * 1e9, 1),
+        'timings': timings,
+        'skipped': skipped,
+        'boundaries_checked': len(boundary_scores()),
+        'disagreements': disagreements,
+    }
+    print(json.dumps(report, indent=2))
+
+    if not args.no_history:
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+
+    if disagreements and args.strict:
+        sys.exit(f'❌ {", ".join(sorted(disagreements))} disagree with wed_view.determine_grade')
+
+
+if __name__ == '__main__':
+    main()
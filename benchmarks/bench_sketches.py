@@ -0,0 +1,77 @@
+"""
+Benchmark ScoreSketch against exact percentiles from statistics.quantiles.
+
+Run:
+  python benchmarks/bench_sketches.py              # 10,000,000 scores
+  python benchmarks/bench_sketches.py --n 1000000
+Prints a JSON report with timings, memory and the observed error of every
+percentile next to the sketch's guaranteed error bound.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sketches import ScoreSketch, DEFAULT_PERCENTILES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n', type=int, default=10_000_000, help='number of scores')
+    parser.add_argument('--shards', type=int, default=8, help='sketches merged at the end')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scores = [min(100.0, max(0.0, rng.gauss(78, 12))) for _ in range(args.n)]
+
+    start = time.perf_counter()
+    shards = [ScoreSketch() for _ in range(args.shards)]
+    for i, score in enumerate(scores):
+        shards[i % args.shards].add(score)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sketch = ScoreSketch()
+    for shard in shards:
+        sketch.merge(shard)
+    merge_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = sketch.percentiles()
+    query_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # 'inclusive' interpolates between ranks like ScoreSketch.quantile
+    cuts = statistics.quantiles(scores, n=100, method='inclusive')
+    exact = {f'p{p}': cuts[p - 1] for p in DEFAULT_PERCENTILES}
+    exact_seconds = time.perf_counter() - start
+
+    errors = {k: abs(approx[k] - exact[k]) for k in exact}
+    report = {
+        'n': args.n,
+        'shards': args.shards,
+        'sketch_build_seconds': round(build_seconds, 3),
+        'sketch_merge_seconds': round(merge_seconds, 6),
+        'sketch_query_seconds': round(query_seconds, 6),
+        'exact_seconds': round(exact_seconds, 3),
+        'sketch_bins': len(sketch.counts),
+        'sketch_bytes': sys.getsizeof(sketch.counts) + 56 * len(sketch.counts),
+        'exact_bytes': sys.getsizeof(scores) + 24 * len(scores),
+        'error_bound': sketch.error_bound,
+        'max_error': max(errors.values()),
+        'percentiles': {k: {'sketch': approx[k], 'exact': exact[k]} for k in exact},
+    }
+    print(json.dumps(report, indent=2))
+    if report['max_error'] > sketch.error_bound + 1e-9:
+        sys.exit('❌ sketch error exceeded its bound')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""
+Load-testing harness for wed_view.py and the grader fleet.
+
+Replays realistic traffic against local instances and prints one JSON report
+with throughput, latency percentiles and error rates per scenario.
+
+Scenarios:
+  login_burst  - every virtual user logs in at once, repeatedly
+  grade_storm  - logged-in teachers submitting grades (POST /api/grade)
+  dashboard    - 30-second dashboard polls compressed into a tight loop
+  pdf_export   - Pro PDF exports (POST /api/download-pdf)
+  chat         - support chat sends and message list refreshes
+  fleet        - grade submissions spread across grader_server_NNN.py ports
+
+Run:
+  python benchmarks/loadtest.py --spawn                       # start wed_view on a temp SQLite DB
+  python benchmarks/loadtest.py --base-url http://127.0.0.1:5000 --scenarios grade_storm,dashboard
+  python benchmarks/loadtest.py --spawn-fleet 8 --scenarios fleet
+Uses only the standard library.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Accounts seeded by wed_view.py on first start
+DEFAULT_EMAIL = 'tade@gru.com'
+DEFAULT_PASSWORD = 'propass123'
+
+SCENARIOS = ('login_burst', 'grade_storm', 'dashboard', 'pdf_export', 'chat', 'fleet')
+
+
+class Client:
+    """One virtual user with its own cookie jar"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, payload=None):
+        """Return (status, elapsed_seconds); network errors come back as status 0"""
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        return status, time.perf_counter() - started
+
+    def login(self, email, password):
+        return self.request('POST', '/api/login', {'email': email, 'password': password})
+
+
+class Recorder:
+    """Thread-safe latency and status collection for one scenario"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.statuses = {}
+
+    def add(self, status, elapsed):
+        with self.lock:
+            self.latencies.append(elapsed)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def report(self, wall_seconds):
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        errors = sum(c for s, c in self.statuses.items() if s == 0 or s >= 500)
+        shed = self.statuses.get(429, 0)
+
+        def pct(p):
+            if not latencies:
+                return None
+            return round(latencies[min(total - 1, int(p / 100 * total))] * 1000, 2)
+
+        return {
+            'requests': total,
+            'throughput_rps': round(total / wall_seconds, 2) if wall_seconds else 0,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'shed_rate': round(shed / total, 4) if total else 0,
+            'latency_ms': {'p50': pct(50), 'p90': pct(90), 'p99': pct(99), 'max': pct(100)},
+            'statuses': {str(s): c for s, c in sorted(self.statuses.items())},
+        }
+
+
+def scenario_steps(name, args, rng):
+    """Return (setup, step) callables for a virtual user in the named scenario"""
+    def login(client):
+        client.login(args.email, args.password)
+
+    def grade(client, rec):
+        rec.add(*client.request('POST', '/api/grade', {
+            'score': round(rng.uniform(40, 100), 1),
+            'name': f'Student {rng.randint(1, 500)}',
+            'subject': rng.choice(['Math', 'Science', 'History', 'English']),
+        }))
+
+    if name == 'login_burst':
+        return None, lambda client, rec: rec.add(*client.login(args.email, args.password))
+    if name == 'grade_storm':
+        return login, grade
+    if name == 'dashboard':
+        paths = ['/api/stats', '/api/servers', '/api/advanced-analytics', '/api/history']
+        return login, lambda client, rec: rec.add(*client.request('GET', rng.choice(paths)))
+    if name == 'pdf_export':
+        return login, lambda client, rec: rec.add(*client.request('POST', '/api/download-pdf'))
+    if name == 'chat':
+        def chat(client, rec):
+            if rng.random() < 0.5:
+                rec.add(*client.request('POST', '/api/chat/send', {'message': 'Load test message'}))
+            else:
+                rec.add(*client.request('GET', '/api/chat/messages'))
+        return login, chat
+    if name == 'fleet':
+        return None, grade
+    raise ValueError(f'Unknown scenario {name}')
+
+
+def run_scenario(name, args):
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.duration
+    if name == 'fleet':
+        urls = [f'http://127.0.0.1:{port}' for port in args.fleet_ports]
+    else:
+        urls = [args.base_url]
+
+    def worker(index):
+        rng = random.Random(args.seed * 1000 + index)
+        setup, step = scenario_steps(name, args, rng)
+        client = Client(urls[index % len(urls)])
+        if setup:
+            setup(client)
+        while time.perf_counter() < deadline:
+            step(client, recorder)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder.report(time.perf_counter() - started)
+
+
+def wait_for_port(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return True
+        except urllib.error.HTTPError:
+            return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    return False
+
+
+def spawn(script, port, env=None):
+    process = subprocess.Popen([sys.executable, script], cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port(f'http://127.0.0.1:{port}/'):
+        process.kill()
+        sys.exit(f'❌ {script} did not start on port {port}')
+    return process
+
+
+def parse_ports(value):
+    ports = []
+    for part in value.split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            ports.extend(range(int(low), int(high) + 1))
+        elif part:
+            ports.append(int(part))
+    return ports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-testing harness for the Test Grader servers')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scenarios', default='login_burst,grade_storm,dashboard,pdf_export,chat')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='virtual users per scenario')
+    parser.add_argument('--email', default=DEFAULT_EMAIL)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--fleet-ports', type=parse_ports, default=parse_ports('5010-5017'))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--spawn', action='store_true', help='start wed_view.py on a temporary SQLite database')
+    parser.add_argument('--spawn-fleet', type=int, default=0, metavar='N',
+                        help='start grader_server_001..N (ports 5010 upward)')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f'unknown scenario {name}; choose from {", ".join(SCENARIOS)}')
+
+    processes = []
+    try:
+        if args.spawn:
+            env = dict(os.environ)
+            env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+            # All virtual users share one account, so lift the per-user rate limit by default
+            env.setdefault('ADMISSION_USER_RATE', '100000')
+            env.setdefault('ADMISSION_USER_BURST', '100000')
+            processes.append(spawn('wed_view.py', 5000, env))
+        for i in range(args.spawn_fleet):
+            processes.append(spawn(f'grader_server_{i + 1:03d}.py', 5010 + i))
+        if args.spawn_fleet:
+            args.fleet_ports = list(range(5010, 5010 + args.spawn_fleet))
+
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'base_url': args.base_url,
+            'duration_s': args.duration,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'scenarios': {},
+        }
+        for name in scenarios:
+            report['scenarios'][name] = run_scenario(name, args)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Signed session claims for the main Flask app.
+
+With SESSION_CLAIMS=1, login stores a short-lived claim with the user's id,
+email, name, plan and stripe_customer_id in the session cookie, which Flask
+signs with SECRET_KEY. Flask-Login's user loader then rebuilds the current
+user from the claim without a database round trip, and only reloads the row
+when the claim has expired or the user's claim version has been bumped.
+
+Versions are bumped in-process whenever a commit changes one of the claimed
+fields or the admin flag, or deletes the user. Other worker processes pick
+such changes up when the claim expires, after at most SESSION_CLAIM_TTL
+seconds (default 300).
+"""
+
+import os
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import current_app, session
+
+from models import User as DbUser
+from replicas import RoutingSession
+
+CLAIM_KEY = '_user_claim'
+
+CLAIM_FIELDS = ('email', 'name', 'plan', 'stripe_customer_id')
+
+# A change to any of these invalidates outstanding claims
+WATCHED_FIELDS = CLAIM_FIELDS + ('is_admin',)
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def init_app(app):
+    """Read SESSION_CLAIMS and SESSION_CLAIM_TTL into the app config"""
+    app.config.setdefault('SESSION_CLAIMS', os.environ.get('SESSION_CLAIMS') == '1')
+    app.config.setdefault('SESSION_CLAIM_TTL', float(os.environ.get('SESSION_CLAIM_TTL', '300')))
+
+
+def enabled():
+    return current_app.config.get('SESSION_CLAIMS', False)
+
+
+def version(user_id):
+    with _versions_lock:
+        return _versions.get(user_id, 0)
+
+
+def bump(user_id):
+    """Invalidate claims issued in this process before now"""
+    with _versions_lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+def issue(db_user):
+    """Store a fresh claim for db_user in the session"""
+    if not enabled():
+        return
+    claim = {field: getattr(db_user, field) for field in CLAIM_FIELDS}
+    claim.update({
+        'id': db_user.id,
+        'v': version(db_user.id),
+        'exp': time.time() + current_app.config['SESSION_CLAIM_TTL'],
+    })
+    session[CLAIM_KEY] = claim
+
+
+def clear():
+    session.pop(CLAIM_KEY, None)
+
+
+def load(user_id):
+    """The session's claim for user_id, or None if it is missing, expired or stale"""
+    if not enabled():
+        return None
+    claim = session.get(CLAIM_KEY)
+    if not claim or claim.get('id') != user_id:
+        return None
+    if claim.get('exp', 0) < time.time():
+        return None
+    # A claim issued by another process may carry a higher version than ours
+    if claim.get('v', -1) < version(user_id):
+        return None
+    return claim
+
+
+@sa.event.listens_for(RoutingSession, 'after_flush')
+def _collect_changes(session_, flush_context):
+    """Remember users whose claimed fields changed, to bump them once committed"""
+    changed = session_.info.setdefault('claims_changed', set())
+    for obj in session_.dirty:
+        if isinstance(obj, DbUser):
+            state = sa.inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in WATCHED_FIELDS):
+                changed.add(obj.id)
+    for obj in session_.deleted:
+        if isinstance(obj, DbUser):
+            changed.add(obj.id)
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _bump_committed(session_):
+    for user_id in session_.info.pop('claims_changed', ()):
+        bump(user_id)
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changes(session_):
+    session_.info.pop('claims_changed', None)
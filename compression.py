@@ -0,0 +1,149 @@
+"""
+Negotiated response compression for the main Flask app.
+
+Text and JSON responses larger than COMPRESS_MIN_SIZE bytes are compressed
+with the best encoding the client accepts: brotli when the `brotli` package
+is installed, gzip otherwise. Generator (streamed) responses are compressed
+chunk by chunk, flushing after each one so the client still receives them
+as they are produced.
+
+Settings (environment):
+  COMPRESS_MIN_SIZE     smallest body worth compressing, in bytes (default 500)
+  COMPRESS_LEVEL        gzip level 1-9 (default 6)
+  COMPRESS_BR_QUALITY   brotli quality 0-11 (default 4)
+"""
+
+import os
+import zlib
+
+from flask import request
+
+import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31 writes a gzip header without a timestamp, so output is reproducible
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class Compression:
+    """after_request hook that compresses eligible responses"""
+
+    def __init__(self, min_size=500, level=6, br_quality=4):
+        self.min_size = min_size
+        self.level = level
+        self.br_quality = br_quality
+
+    def available(self):
+        """Encodings in order of preference"""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def negotiate(self, accept_encodings):
+        """Best encoding the client accepts, or None for identity"""
+        best, best_quality = None, 0
+        for encoding in self.available():
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressor(self, encoding):
+        if encoding == 'br':
+            return BrotliCompressor(self.br_quality)
+        return GzipCompressor(self.level)
+
+    def eligible(self, response):
+        if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', ''):
+            return False
+        return (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)
+
+    def __call__(self, response):
+        if not self.eligible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self.stream(response.iter_encoded(), self.compressor(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            with metrics.timed('compression'):
+                compressor = self.compressor(encoding)
+                response.set_data(compressor.compress(body) + compressor.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The compressed body is a different representation
+            response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    @staticmethod
+    def stream(chunks, compressor):
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+def init_app(app):
+    """Compress responses according to the request's Accept-Encoding"""
+    compression = Compression(
+        min_size=int(os.environ.get('COMPRESS_MIN_SIZE', '500')),
+        level=int(os.environ.get('COMPRESS_LEVEL', '6')),
+        br_quality=int(os.environ.get('COMPRESS_BR_QUALITY', '4')),
+    )
+    app.extensions['compression'] = compression
+    app.after_request(compression)
+    return compression
@@ -1,17 +1,19 @@
 import os
 
-server_template = '''from flask import Flask, render_template_string, request, jsonify
+server_template = '''from flask import Flask, render_template_string, request, jsonify, Response
 from datetime import datetime
+import gzip
+import hashlib
 
 app = Flask(__name__)
 
-GRADE_SCALE = {
+GRADE_SCALE = {{
     97: ("A+", "Outstanding!", 4.0), 93: ("A", "Excellent!", 4.0), 90: ("A-", "Great!", 3.7),
     87: ("B+", "Very good!", 3.3), 83: ("B", "Good!", 3.0), 80: ("B-", "Decent!", 2.7),
     77: ("C+", "Fair!", 2.3), 73: ("C", "Average!", 2.0), 70: ("C-", "Passing!", 1.7),
     67: ("D+", "Below avg!", 1.3), 63: ("D", "Poor!", 1.0), 60: ("D-", "Barely!", 0.7),
     0: ("F", "Failed!", 0.0)
-}
+}}
 
 def determine_grade(score):
     for threshold in sorted(GRADE_SCALE.keys(), reverse=True):
@@ -19,14 +21,14 @@ def determine_grade(score):
             return GRADE_SCALE[threshold]
     return ("F", "Failed!", 0.0)
 
-HTML = """<html><head><title>Grader {port}</title><style>
+HTML_TEMPLATE = """<!DOCTYPE html><html><head><title>Grader {port}</title><style>
 body{{font-family:Arial;max-width:600px;margin:50px auto;background:#f5f5f5}}
 .container{{background:white;padding:30px;border-radius:8px}}h1{{color:#4c3f91}}
 input,button{{padding:10px;margin:10px 0;width:100%;border:1px solid #ddd;border-radius:4px}}
 button{{background:#667eea;color:white;cursor:pointer;border:none}}button:hover{{background:#4c3f91}}
 .result{{margin-top:30px;padding:20px;background:#e8f4fd;border-radius:4px;display:none}}
 .result.show{{display:block}}.grade{{font-size:36px;color:#4c3f91;font-weight:bold}}
-</style></head><body><div class="container"><h1>📊 Grader {port}</h1>
+</style></head><body><div class="container"><h1>📊 Server {port}</h1>
 <form id="f"><input type="text" id="n" placeholder="Name"><input type="text" id="s" placeholder="Subject">
 <input type="number" id="sc" placeholder="Score" min="0" max="100" required>
 <button type="submit">Grade</button></form>
@@ -38,9 +40,23 @@ const d=await r.json();document.getElementById('g').textContent=d.letter_grade;
 document.getElementById('fb').textContent='Score: '+d.score+'/100 | GPA: '+d.gpa.toFixed(2);
 document.getElementById('r').classList.add('show');}});</script></body></html>"""
 
+# The page has no template variables: render it once at startup and serve the
+# precomputed bytes (and a gzip variant) instead of compiling it on every hit
+with app.app_context():
+    INDEX_HTML = render_template_string(HTML_TEMPLATE).encode('utf-8')
+INDEX_GZIP = gzip.compress(INDEX_HTML, 9, mtime=0)
+INDEX_ETAG = hashlib.sha1(INDEX_HTML).hexdigest()[:16]
+
 @app.route('/')
 def index():
-    return render_template_string(HTML)
+    gzipped = request.accept_encodings['gzip'] > 0
+    response = Response(INDEX_GZIP if gzipped else INDEX_HTML, mimetype='text/html')
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.set_etag(INDEX_ETAG + ('-gzip' if gzipped else ''))
+    return response.make_conditional(request)
 
 @app.route('/api/grade', methods=['POST'])
 def grade_test():
@@ -0,0 +1,47 @@
+"""
+Building blocks for grader plugins: the two grading scales in use and the
+Grader that applies one.
+"""
+
+# v1.0.7 through v10.0.0 and v14.0.0
+DETAILED_SCALE = {
+    97: ("A+", "Outstanding! Exceptional mastery!", 4.0),
+    93: ("A", "Excellent work! Superior performance!", 4.0),
+    90: ("A-", "Great job! Strong understanding!", 3.7),
+    87: ("B+", "Very good! Above average work!", 3.3),
+    83: ("B", "Good work! Solid performance!", 3.0),
+    80: ("B-", "Decent job! Room for growth!", 2.7),
+    77: ("C+", "Fair work! Satisfactory!", 2.3),
+    73: ("C", "Average performance!", 2.0),
+    70: ("C-", "Passing but needs improvement!", 1.7),
+    67: ("D+", "Below average. More study needed!", 1.3),
+    63: ("D", "Poor performance. Significant improvement needed!", 1.0),
+    60: ("D-", "Barely passing. Critical improvement required!", 0.7),
+    0: ("F", "Failed. Please seek help immediately!", 0.0)
+}
+
+# v11.0.0 through v13.0.0
+SHORT_SCALE = {
+    97: ("A+", "Outstanding!", 4.0), 93: ("A", "Excellent!", 4.0),
+    90: ("A-", "Great job!", 3.7), 87: ("B+", "Very good!", 3.3),
+    83: ("B", "Good work!", 3.0), 80: ("B-", "Decent job!", 2.7),
+    77: ("C+", "Fair work!", 2.3), 73: ("C", "Average!", 2.0),
+    70: ("C-", "Passing!", 1.7), 67: ("D+", "Below average!", 1.3),
+    63: ("D", "Poor!", 1.0), 60: ("D-", "Critical!", 0.7), 0: ("F", "Failed!", 0.0)
+}
+
+
+class Grader:
+    """A grading scale"""
+
+    def __init__(self, version, scale):
+        self.version = version
+        self.scale = scale
+        self.thresholds = sorted(scale, reverse=True)
+
+    def grade(self, score):
+        """(letter_grade, feedback, gpa) for a 0-100 score"""
+        for threshold in self.thresholds:
+            if score >= threshold:
+                return self.scale[threshold]
+        return self.scale[0]
@@ -0,0 +1,5 @@
+"""Test Grader v10.0.0: detailed scale"""
+
+from graders.base import Grader, DETAILED_SCALE
+
+grader = Grader('v10.0.0', DETAILED_SCALE)
@@ -0,0 +1,5 @@
+"""Test Grader v11.0.0: short scale"""
+
+from graders.base import Grader, SHORT_SCALE
+
+grader = Grader('v11.0.0', SHORT_SCALE)
@@ -0,0 +1,5 @@
+"""Test Grader v14.0.0 (wed_view): detailed scale; the web app stores grades in its own database"""
+
+from graders.base import Grader, DETAILED_SCALE
+
+grader = Grader('v14.0.0', DETAILED_SCALE)
@@ -0,0 +1,5 @@
+"""Test Grader v1.0.7: detailed scale"""
+
+from graders.base import Grader, DETAILED_SCALE
+
+grader = Grader('v1.0.7', DETAILED_SCALE)
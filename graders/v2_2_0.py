@@ -0,0 +1,5 @@
+"""Test Grader v2.2.0: detailed scale"""
+
+from graders.base import Grader, DETAILED_SCALE
+
+grader = Grader('v2.2.0', DETAILED_SCALE)
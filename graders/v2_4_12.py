@@ -0,0 +1,5 @@
+"""Test Grader v2.4.12: detailed scale"""
+
+from graders.base import Grader, DETAILED_SCALE
+
+grader = Grader('v2.4.12', DETAILED_SCALE)
@@ -0,0 +1,239 @@
+"""
+Request instrumentation for the main Flask app, exposed in the Prometheus
+text exposition format.
+
+Records per-route latency histograms, status counts and the in-flight gauge,
+plus how much of each request went to database queries, password hashing,
+JSON serialization and response compression.
+"""
+
+import threading
+import time
+from contextlib import ContextDecorator
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request phases timed with `timed(phase)`
+PHASES = ('db', 'password_hash', 'serialization', 'compression')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self, kind='counter'):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {kind}']
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values, value):
+        with self.lock:
+            self.values[label_values] = value
+
+    def render(self, kind='gauge'):
+        return super().render(kind)
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for label_values, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets, counts):
+                    cumulative += c
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f'{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+                lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines at scrape time"""
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by route', ('route', 'method')))
+REQUEST_TOTAL = REGISTRY.register(Counter(
+    'http_requests_total', 'Requests by route and status', ('route', 'method', 'status')))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'http_requests_in_flight', 'Requests currently being served'))
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    'http_request_phase_seconds', 'Time per request spent in db, password_hash, serialization and compression',
+    ('route', 'phase')))
+
+
+class timed(ContextDecorator):
+    """Add elapsed time to a phase of the current request (context manager or decorator)"""
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def _recreate_cm(self):
+        # A decorated function may run in several threads at once; each call needs its own start time
+        return type(self)(self.phase)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add_phase_time(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+def add_phase_time(phase, seconds):
+    if has_request_context() and 'metrics_phases' in g:
+        g.metrics_phases[phase] = g.metrics_phases.get(phase, 0.0) + seconds
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that books jsonify() time as serialization"""
+
+    def response(self, *args, **kwargs):
+        with timed('serialization'):
+            return super().response(*args, **kwargs)
+
+
+# Callables run as observer(statement, parameters, seconds) after every statement
+# (sqlprofile's per-request profile), so each statement is timed only once
+QUERY_OBSERVERS = []
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+    add_phase_time('db', elapsed)
+    for observer in QUERY_OBSERVERS:
+        observer(statement, parameters, elapsed)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _query_failed(exception_context):
+    """A failed statement never reaches after_cursor_execute; drop its start time"""
+    conn = exception_context.connection
+    stack = conn.info.get('metrics_query_start') if conn is not None else None
+    if stack:
+        stack.pop()
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def init_app(app):
+    """Install request instrumentation; register before other before_request hooks"""
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def metrics_start():
+        g.metrics_started = time.perf_counter()
+        g.metrics_phases = {}
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def metrics_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def metrics_finish(exc=None):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        REQUESTS_IN_FLIGHT.dec()
+        route = _route()
+        REQUEST_LATENCY.observe(time.perf_counter() - started, route, request.method)
+        REQUEST_TOTAL.inc(route, request.method, str(g.pop('metrics_status', 500)))
+        phases = g.pop('metrics_phases', {})
+        for phase in PHASES:
+            PHASE_SECONDS.observe(phases.get(phase, 0.0), route, phase)
+
+
+def metrics_response():
+    """Response for the /metrics endpoint"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
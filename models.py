@@ -1,11 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import DeclarativeBase
+from replicas import RoutingSession
 
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 
 class GradeServer(db.Model):
     """Model for grader servers"""
@@ -23,15 +25,20 @@ class GradeReport(db.Model):
     """Model for storing grade reports"""
     __tablename__ = 'grade_reports'
     
+    __table_args__ = (
+        db.Index('ix_grade_reports_user_created', 'user_id', 'created_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     server_id = db.Column(db.Integer, db.ForeignKey('grade_servers.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
     student_name = db.Column(db.String(255), default='Anonymous')
     subject = db.Column(db.String(255), default='General')
     score = db.Column(db.Float, nullable=False)
     letter_grade = db.Column(db.String(2), nullable=False)
     feedback = db.Column(db.Text)
     gpa = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -61,6 +68,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     messages = db.relationship('ChatMessage', backref='user', lazy=True, cascade='all, delete-orphan')
+    grade_reports = db.relationship('GradeReport', backref='owner', lazy=True, passive_deletes=True)
     
     def to_dict(self):
         return {
@@ -91,3 +99,20 @@ class ChatMessage(db.Model):
             'message': self.message,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a database was first created.
+
+    db.create_all() only creates missing tables, so existing deployments get
+    new columns here. Safe to run on every start.
+    """
+    inspector = inspect(db.engine)
+    columns = {c['name'] for c in inspector.get_columns('grade_reports')}
+    indexes = {i['name'] for i in inspector.get_indexes('grade_reports')}
+    with db.engine.begin() as conn:
+        if 'user_id' not in columns:
+            conn.execute(text('ALTER TABLE grade_reports ADD COLUMN user_id INTEGER REFERENCES users(id) ON DELETE SET NULL'))
+        if 'ix_grade_reports_created_at' not in indexes:
+            conn.execute(text('CREATE INDEX ix_grade_reports_created_at ON grade_reports (created_at)'))
+        if 'ix_grade_reports_user_created' not in indexes:
+            conn.execute(text('CREATE INDEX ix_grade_reports_user_created ON grade_reports (user_id, created_at)'))
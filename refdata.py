@@ -0,0 +1,107 @@
+"""
+In-process cache of reference data for the main Flask app.
+
+grade_servers holds a handful of rows that change only when servers are
+added or retired, yet the grading path and the dashboard polls looked them
+up on every request. The cache keeps them as plain dicts, loaded once (at
+startup or on first use) and dropped after any commit that inserts, updates
+or deletes a GradeServer. Other worker processes reload after at most
+REFDATA_TTL seconds (default 300).
+"""
+
+import os
+import threading
+import time
+
+import sqlalchemy as sa
+
+from models import db, GradeServer
+from replicas import RoutingSession
+
+REFDATA_TTL = float(os.environ.get('REFDATA_TTL', '300'))
+
+# Version codes for console access
+VERSION_CODES = {
+    'GRADE10': 'v10.0.0',
+    'GRADE11': 'v11.0.0',
+    'GRADE12': 'v12.0.0',
+    'GRADE13': 'v13.0.0',
+    'GRADE14': 'v14.0.0'
+}
+
+
+class ReferenceCache:
+    """GradeServer rows as dicts, indexed by id and version"""
+
+    def __init__(self, ttl=REFDATA_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._data = None
+
+    def load(self):
+        """Read every GradeServer row; call inside an app context"""
+        rows = db.session.execute(db.select(
+            GradeServer.id, GradeServer.version, GradeServer.port, GradeServer.status, GradeServer.created_at
+        ).order_by(GradeServer.id)).all()
+        servers = tuple({
+            'id': row.id,
+            'version': row.version,
+            'port': row.port,
+            'status': row.status,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        } for row in rows)
+        by_version = {}
+        for server in servers:
+            # First row wins, matching filter_by(version=...).first()
+            by_version.setdefault(server['version'], server)
+        data = {
+            'servers': servers,
+            'by_id': {server['id']: server for server in servers},
+            'by_version': by_version,
+            'loaded_at': time.monotonic(),
+        }
+        with self.lock:
+            self._data = data
+        return data
+
+    def invalidate(self):
+        with self.lock:
+            self._data = None
+
+    def _current(self):
+        data = self._data
+        if data is None or time.monotonic() - data['loaded_at'] > self.ttl:
+            data = self.load()
+        return data
+
+    def servers(self):
+        """All grade servers, ordered by id"""
+        return self._current()['servers']
+
+    def server_by_version(self, version):
+        return self._current()['by_version'].get(version)
+
+    def server_by_id(self, server_id):
+        return self._current()['by_id'].get(server_id)
+
+
+cache = ReferenceCache()
+
+
+@sa.event.listens_for(RoutingSession, 'after_flush')
+def _collect_changes(session_, flush_context):
+    for obj in (*session_.new, *session_.dirty, *session_.deleted):
+        if isinstance(obj, GradeServer):
+            session_.info['refdata_changed'] = True
+            return
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_committed(session_):
+    if session_.info.pop('refdata_changed', False):
+        cache.invalidate()
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _discard_changes(session_):
+    session_.info.pop('refdata_changed', None)
@@ -0,0 +1,92 @@
+"""
+Read-replica routing for the main Flask app.
+
+Writes always go to the primary DATABASE_URL. Views wrapped with
+@read_replica send their SELECTs to one of the replica URLs listed in
+DATABASE_REPLICA_URLS (comma separated), except for a short read-your-writes
+window after the logged-in user last wrote something, so a teacher always sees
+the grade they just submitted.
+"""
+
+import itertools
+import os
+import time
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+
+# Seconds after a user's last write during which their reads stay on the primary
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', '5'))
+
+WRITE_MARK_KEY = '_db_write_at'
+
+
+def init_app(app):
+    """Create replica engines from SQLALCHEMY_REPLICA_URIS or DATABASE_REPLICA_URLS"""
+    urls = app.config.get('SQLALCHEMY_REPLICA_URIS')
+    if urls is None:
+        urls = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+        app.config['SQLALCHEMY_REPLICA_URIS'] = urls
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engines = [sa.create_engine(url, **options) for url in urls]
+    app.extensions['replicas'] = {
+        'engines': engines,
+        'cycle': itertools.cycle(engines) if engines else None,
+    }
+
+
+def read_replica(view):
+    """Route the reads of a read-only view to a replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def mark_write():
+    """Start the read-your-writes window for the current user"""
+    if has_request_context() and _current_user_id() is not None:
+        session[WRITE_MARK_KEY] = time.time()
+
+
+def _current_user_id():
+    from flask_login import current_user
+    if current_user and current_user.is_authenticated:
+        return current_user.get_id()
+    return None
+
+
+def _replica_engine():
+    """Replica engine to use for this read, or None to stay on the primary"""
+    if not has_request_context() or not g.get('db_read_replica'):
+        return None
+    replicas = current_app.extensions.get('replicas')
+    if not replicas or replicas['cycle'] is None:
+        return None
+    last_write = session.get(WRITE_MARK_KEY)
+    if last_write and time.time() - last_write < READ_YOUR_WRITES_SECONDS:
+        return None
+    # Stick to one replica per request so its reads see a single snapshot
+    if 'db_replica_engine' not in g:
+        g.db_replica_engine = next(replicas['cycle'])
+    return g.db_replica_engine
+
+
+class RoutingSession(Session):
+    """Session that sends reads from @read_replica views to a replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, sa.UpdateBase):
+            engine = _replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@sa.event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush(session_, flush_context):
+    """Any flushed change by a logged-in user opens their read-your-writes window"""
+    mark_write()
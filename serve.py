@@ -0,0 +1,286 @@
+"""
+Serve the Flask app defined in one of the repo's scripts.
+
+The script is imported as a module, so its `if __name__ == '__main__'` block
+(and the development server it starts) does not run. The app is served by
+Werkzeug's threaded WSGI server, either on its own port or on a listening
+socket inherited from supervisor.py, which lets several worker processes
+share one port.
+
+On SIGTERM the worker stops accepting connections, lets in-flight requests
+finish (up to --drain-timeout seconds) and exits, so a rolling restart does
+not drop requests.
+
+With --workers N the app is imported once and then forked into N worker
+processes, so the loaded code is shared copy-on-write. Each worker listens on
+its own SO_REUSEPORT socket and the kernel spreads connections across them
+(one inherited socket is shared where SO_REUSEPORT is unavailable). With
+--max-requests, a worker is replaced after serving that many requests, to
+bound memory growth.
+
+Run:
+  python serve.py wed_view.py --port 5000
+  python serve.py wed_view.py --port 5000 --workers 4 --max-requests 10000
+  python serve.py "test grader v10.0.0 server.py" --port 5010
+  python serve.py wed_view.py --call init_db      # run a setup function and exit
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import re
+import select
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+def load_module(script):
+    """Import a script by path under a module name derived from its file name"""
+    path = os.path.abspath(script)
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = re.sub(r'\W', '_', os.path.splitext(os.path.basename(path))[0])
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Flask looks the module up by name to find its root path
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_app(script, attr='app'):
+    return getattr(load_module(script), attr)
+
+
+class DrainingRequestHandler(WSGIRequestHandler):
+    """Request handler that keeps a count of in-flight requests on its server.
+
+    Idle keep-alive connections are not counted, so they do not hold up a drain.
+    """
+
+    def run_wsgi(self):
+        server = self.server
+        with server.in_flight_lock:
+            server.in_flight += 1
+        try:
+            super().run_wsgi()
+        finally:
+            with server.in_flight_lock:
+                server.in_flight -= 1
+                server.handled += 1
+                recycle = server.max_requests and server.handled >= server.max_requests and not server.recycling
+                if recycle:
+                    server.recycling = True
+            if recycle:
+                threading.Thread(target=server.recycle, daemon=True).start()
+
+
+def create_server(app, host='0.0.0.0', port=5000, fd=None, max_requests=0):
+    server = make_server(host, port, app, threaded=True, request_handler=DrainingRequestHandler, fd=fd)
+    server.in_flight = 0
+    server.in_flight_lock = threading.Lock()
+    server.handled = 0
+    server.max_requests = max_requests
+    server.recycling = False
+    server.recycle = server.shutdown
+    return server
+
+
+def wait_for_drain(server, timeout):
+    """Wait until no request is in flight, or timeout seconds; returns True if drained"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with server.in_flight_lock:
+            if server.in_flight == 0:
+                return True
+        time.sleep(0.05)
+    return False
+
+
+def accept_backlog(server):
+    """Serve connections already queued on the socket.
+
+    A closed SO_REUSEPORT socket drops its queue instead of handing it to the
+    other workers, so a worker leaving the group empties it first.
+    """
+    while select.select([server.socket], [], [], 0)[0]:
+        server._handle_request_noblock()
+
+
+def serve(server, drain_timeout=30, ready_fd=None, reuseport=False):
+    """Serve until SIGTERM or SIGINT (or the request limit), then drain and return"""
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever() to return, so it cannot run on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if ready_fd is not None:
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+
+    # Werkzeug's serve_forever() closes the socket on return; the queue may still need serving
+    socketserver.BaseServer.serve_forever(server)
+    if reuseport:
+        accept_backlog(server)
+    drained = wait_for_drain(server, drain_timeout)
+    server.server_close()
+    return drained
+
+
+def bind_socket(host, port, reuseport=False):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuseport:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    return sock
+
+
+def _run_worker(app, host, port, shared, max_requests, drain_timeout, post_fork):
+    """Body of a forked worker; never returns to the caller"""
+    code = 0
+    try:
+        if post_fork:
+            post_fork()
+        sock = shared or bind_socket(host, port, reuseport=True)
+        # Stagger the limit so workers started together are not all recycled together
+        limit = max_requests + random.randint(0, max_requests // 10) if max_requests else 0
+        server = create_server(app, host, port, fd=sock.fileno(), max_requests=limit)
+        sock.close()
+
+        def recycle():
+            # Have the master start a replacement before this worker stops accepting
+            os.kill(os.getppid(), signal.SIGUSR1)
+            time.sleep(1)
+            server.shutdown()
+
+        server.recycle = recycle
+        serve(server, drain_timeout, reuseport=shared is None)
+    except Exception:
+        traceback.print_exc()
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def prefork(app, host='0.0.0.0', port=5000, workers=2, max_requests=0, drain_timeout=30, post_fork=None):
+    """Fork `workers` processes serving app until SIGTERM or SIGINT.
+
+    Import and initialise the app before calling, so workers share it. post_fork
+    runs in each worker right after the fork (e.g. to drop inherited DB pools).
+    """
+    reuseport = hasattr(socket, 'SO_REUSEPORT')
+    if reuseport:
+        # Fail here if the port is taken, rather than in every worker; a bound but
+        # non-listening socket receives no connections, so it can stay open
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        probe.bind((host, port))
+        shared = None
+    else:
+        probe = None
+        shared = bind_socket(host, port)
+
+    children = {}
+    state = {'stopping': False, 'replacements': 0, 'recycling': 0}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+                signal.signal(signum, signal.SIG_DFL)
+            if probe:
+                probe.close()
+            _run_worker(app, host, port, shared, max_requests, drain_timeout, post_fork)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        state['stopping'] = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def replace(signum, frame):
+        state['replacements'] += 1
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, replace)
+
+    for _ in range(workers):
+        spawn()
+    print(f'Serving on http://{host}:{port} with {workers} workers (master pid {os.getpid()})', flush=True)
+
+    while children:
+        while state['replacements'] and not state['stopping']:
+            state['replacements'] -= 1
+            state['recycling'] += 1
+            spawn()
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            time.sleep(0.1)
+            continue
+        started = children.pop(pid, None)
+        if started is None or state['stopping']:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if state['recycling']:
+            # Recycled worker; its replacement is already running
+            state['recycling'] -= 1
+            if code:
+                print(f'Worker {pid} exited with {code} while being recycled', flush=True)
+            continue
+        print(f'Worker {pid} exited with {code}, restarting', flush=True)
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+
+    (probe or shared).close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Flask app from one of the Test Grader scripts')
+    parser.add_argument('script', help='path to the script defining the app')
+    parser.add_argument('--app', default='app', help='name of the Flask app in the script')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--fd', type=int, help='inherited listening socket to serve on instead of binding')
+    parser.add_argument('--ready-fd', type=int, help='pipe to write one byte to once serving')
+    parser.add_argument('--drain-timeout', type=float, default=30,
+                        help='seconds to let in-flight requests finish on shutdown')
+    parser.add_argument('--workers', type=int, default=1, help='fork this many worker processes')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='replace a worker after it has served this many requests (0 = never)')
+    parser.add_argument('--call', metavar='FUNCTION', help='call this function from the script and exit')
+    args = parser.parse_args()
+
+    if args.call:
+        module = load_module(args.script)
+        getattr(module, args.call)()
+        return
+
+    app = load_app(args.script, args.app)
+    if args.workers > 1 or args.max_requests:
+        prefork(app, args.host, args.port, args.workers, args.max_requests, args.drain_timeout)
+        return
+    server = create_server(app, args.host, args.port, args.fd)
+    if not serve(server, args.drain_timeout, args.ready_fd):
+        print(f'⚠️ {args.script}: exited with requests still in flight', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Mergeable percentile sketches for grade scores.
+
+Scores always fall in 0-100, so a fixed-resolution histogram is a bounded-size,
+mergeable quantile sketch: at most 1001 counters at the default 0.1 resolution,
+whatever the number of grades, stored sparsely so a day with a handful of
+grades holds only a handful of bins. Every quantile is within half a bin
+(0.05 points) of the exact answer.
+
+SketchStore keeps one sketch per (teacher, server, subject, day). It catches
+up on new grade reports by created_at, rescanning an overlap window and
+skipping ids it has already counted, so it stays current even when other
+worker processes insert the rows and commit them out of order.
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+
+from models import db, GradeReport
+
+RESOLUTION = 0.1
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+# How far back each refresh rescans; a report committed later than this after its created_at is missed
+OVERLAP_SECONDS = float(os.environ.get('SKETCH_OVERLAP_SECONDS', '300'))
+
+
+class ScoreSketch:
+    """Histogram sketch over the 0-100 score range"""
+
+    def __init__(self, resolution=RESOLUTION):
+        self.resolution = resolution
+        self.scale = round(1 / resolution)
+        self.max_index = 100 * self.scale
+        self.counts = {}
+        self.count = 0
+
+    @property
+    def error_bound(self):
+        """Maximum absolute error of any quantile, in score points"""
+        return self.resolution / 2
+
+    def _bin(self, score):
+        return min(max(int(round(score * self.scale)), 0), self.max_index)
+
+    def add(self, score, weight=1):
+        index = self._bin(score)
+        self.counts[index] = self.counts.get(index, 0) + weight
+        self.count += weight
+
+    def add_bin(self, index, weight):
+        """Add a pre-aggregated count for a bin index (score * scale)"""
+        index = min(max(int(index), 0), self.max_index)
+        self.counts[index] = self.counts.get(index, 0) + weight
+        self.count += weight
+
+    def merge(self, other):
+        """Fold another sketch with the same resolution into this one"""
+        if other.resolution != self.resolution:
+            raise ValueError('Cannot merge sketches with different resolutions')
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.count += other.count
+        return self
+
+    def _value_at(self, rank):
+        """Score of the rank-th smallest grade (0-based)"""
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen > rank:
+                return i / self.scale
+        return max(self.counts) / self.scale
+
+    def quantile(self, q):
+        """Score at quantile q (0-1), linearly interpolated between ranks, or None for an empty sketch
+
+        Same rule as v12's GradeStatistics.percentile and
+        statistics.quantiles(method='inclusive').
+        """
+        if not self.count:
+            return None
+        position = (self.count - 1) * q
+        lower = int(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return low_value
+        return low_value + (self._value_at(lower + 1) - low_value) * (position - lower)
+
+    def percentiles(self, ps=DEFAULT_PERCENTILES):
+        """Dict such as {'p10': 61.5, 'p50': 80.0, ...}"""
+        return {f'p{p}': self.quantile(p / 100) for p in ps}
+
+    def percentile_rank(self, score):
+        """Percentage of scores less than or equal to score"""
+        if not self.count:
+            return 0.0
+        index = self._bin(score)
+        return sum(c for i, c in self.counts.items() if i <= index) / self.count * 100
+
+    def to_dict(self):
+        """Sparse serialized form"""
+        return {
+            'resolution': self.resolution,
+            'bins': {str(i): c for i, c in sorted(self.counts.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data.get('resolution', RESOLUTION))
+        for index, c in data.get('bins', {}).items():
+            sketch.add_bin(int(index), c)
+        return sketch
+
+
+class SketchStore:
+    """Per (user_id, server_id, subject, day) sketches kept current from grade_reports"""
+
+    def __init__(self, resolution=RESOLUTION, overlap_seconds=OVERLAP_SECONDS):
+        self.resolution = resolution
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.sketches = {}
+        # Every report created before horizon is counted; recent holds the ids
+        # counted at or after it, so rescanning the overlap window skips them
+        self.horizon = None
+        self.recent = {}
+        self.lock = threading.Lock()
+
+    def _sketch(self, user_id, server_id, subject, day):
+        key = (user_id, server_id, subject or 'General', str(day)[:10])
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = ScoreSketch(self.resolution)
+        return sketch
+
+    def refresh(self):
+        """Fold in reports created since the last refresh, rescanning the overlap window"""
+        horizon = datetime.utcnow() - self.overlap
+        with self.lock:
+            if self.horizon is None:
+                # First load: one GROUP BY over everything older than the window
+                scale = round(1 / self.resolution)
+                day = db.func.date(GradeReport.created_at)
+                bin_index = db.func.round(GradeReport.score * scale)
+                rows = db.session.query(
+                    GradeReport.user_id, GradeReport.server_id, GradeReport.subject, day, bin_index,
+                    db.func.count(GradeReport.id)
+                ).filter(
+                    GradeReport.created_at < horizon
+                ).group_by(GradeReport.user_id, GradeReport.server_id, GradeReport.subject, day, bin_index).all()
+                for user_id, server_id, subject, row_day, index, count in rows:
+                    self._sketch(user_id, server_id, subject, row_day).add_bin(index, count)
+                start = horizon
+            else:
+                start = min(self.horizon, horizon)
+            rows = db.session.query(
+                GradeReport.id, GradeReport.user_id, GradeReport.server_id, GradeReport.subject,
+                GradeReport.created_at, GradeReport.score
+            ).filter(GradeReport.created_at >= start).all()
+            for report_id, user_id, server_id, subject, created_at, score in rows:
+                if report_id in self.recent:
+                    continue
+                self.recent[report_id] = created_at
+                self._sketch(user_id, server_id, subject, created_at).add(score)
+            self.horizon = max(start, horizon)
+            self.recent = {i: created for i, created in self.recent.items() if created >= self.horizon}
+
+    def query(self, user_id, server_id=None, subject=None, start=None, end=None):
+        """Merged sketch of a teacher's grades for the matching servers, subjects and [start, end) days"""
+        self.refresh()
+        start_day = start.strftime('%Y-%m-%d') if start else None
+        end_day = end.strftime('%Y-%m-%d') if end else None
+        # An end with a time part still covers the rest of that day
+        end_inclusive = end is not None and end != datetime(end.year, end.month, end.day)
+        merged = ScoreSketch(self.resolution)
+        with self.lock:
+            for (key_user, key_server, key_subject, key_day), sketch in self.sketches.items():
+                if key_user != user_id:
+                    continue
+                if server_id is not None and key_server != server_id:
+                    continue
+                if subject is not None and key_subject != subject:
+                    continue
+                if start_day and key_day < start_day:
+                    continue
+                if end_day and (key_day > end_day or (key_day == end_day and not end_inclusive)):
+                    continue
+                merged.merge(sketch)
+        return merged
+
+
+store = SketchStore()
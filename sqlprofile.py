@@ -0,0 +1,109 @@
+"""
+Per-request SQL profiling for the main Flask app.
+
+Counts the queries each request issues and their total time, flags statements
+repeated within one request (the usual sign of an N+1 loop), and appends
+queries slower than SLOW_QUERY_MS to slow_queries.log with their bound
+parameters and route.
+
+Views can declare a query budget with @query_budget(n). Going over budget is
+logged, and raises AssertionError when the app runs in testing mode (or with
+SQL_PROFILE_ASSERT=1) so the route's test fails.
+"""
+
+import logging
+import os
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+import metrics
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'slow_queries.log')
+# Same statement this many times in one request is reported as a possible N+1
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5'))
+
+logger = logging.getLogger('sqlprofile')
+
+QUERIES_PER_REQUEST = metrics.REGISTRY.register(metrics.Histogram(
+    'http_request_db_queries', 'SQL statements issued per request', ('route',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)))
+
+_slow_log = None
+
+
+def _slow_logger():
+    """File logger for slow statements, created on first use"""
+    global _slow_log
+    if _slow_log is None:
+        _slow_log = logging.getLogger('sqlprofile.slow')
+        _slow_log.setLevel(logging.INFO)
+        _slow_log.propagate = False
+        handler = logging.FileHandler(SLOW_QUERY_LOG, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        _slow_log.addHandler(handler)
+    return _slow_log
+
+
+def query_budget(max_queries):
+    """Declare the most SQL statements a view may issue per request"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.sql_budget = max_queries
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else request.path
+
+
+def _observe(statement, parameters, elapsed):
+    """Add a finished statement to the request's profile; timed by metrics' cursor listeners"""
+    if not has_request_context() or 'sql_profile' not in g:
+        return
+    profile = g.sql_profile
+    profile['count'] += 1
+    profile['seconds'] += elapsed
+    profile['statements'][statement] = profile['statements'].get(statement, 0) + 1
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _slow_logger().info('route=%s ms=%.1f statement=%s params=%r',
+                            _route(), elapsed * 1000, ' '.join(statement.split()), parameters)
+
+
+metrics.QUERY_OBSERVERS.append(_observe)
+
+
+def init_app(app):
+    """Install per-request SQL profiling"""
+
+    @app.before_request
+    def sqlprofile_start():
+        g.sql_profile = {'count': 0, 'seconds': 0.0, 'statements': {}}
+
+    @app.after_request
+    def sqlprofile_finish(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        route = _route()
+        QUERIES_PER_REQUEST.observe(profile['count'], route)
+
+        for statement, times in profile['statements'].items():
+            if times >= N_PLUS_ONE_THRESHOLD:
+                logger.warning('Possible N+1 on %s: statement ran %d times: %s',
+                               route, times, ' '.join(statement.split())[:200])
+
+        if current_app.debug or current_app.testing:
+            response.headers['X-Query-Count'] = str(profile['count'])
+            response.headers['X-Query-Time-Ms'] = f"{profile['seconds'] * 1000:.1f}"
+
+        budget = g.pop('sql_budget', None)
+        if budget is not None and profile['count'] > budget:
+            message = f'{route} issued {profile["count"]} queries (budget {budget})'
+            if current_app.testing or os.environ.get('SQL_PROFILE_ASSERT') == '1':
+                raise AssertionError(message)
+            logger.warning(message)
+        return response
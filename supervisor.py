@@ -0,0 +1,320 @@
+"""
+Process supervisor for the multi-port Test Grader deployment.
+
+Starts every service listed in a manifest (fleet.json by default) with one
+command instead of a terminal per server. For each service the supervisor
+binds the listening socket itself and starts `workers` serve.py processes
+that share it, so restarting a worker never closes the port.
+
+- Health probes: GET <health> on each service every probe_interval seconds;
+  probe_failures consecutive failures trigger a rolling restart.
+- Crashed workers are restarted with exponential backoff (1s doubling up to
+  max_backoff); a worker that stayed up for 60 seconds resets its backoff.
+- SIGHUP performs a rolling restart of every service: each worker is replaced
+  by a new one, which must report ready before the old one is sent SIGTERM.
+  Old workers drain their in-flight requests in the background; the main loop
+  reaps them, and kills any still running drain_timeout + 5 seconds later.
+- SIGTERM / SIGINT stop everything, letting workers drain first.
+
+Run:
+  python supervisor.py                     # fleet.json
+  python supervisor.py --manifest my_fleet.json --only wed_view,grader-v10
+  kill -HUP <supervisor pid>               # rolling restart
+"""
+
+import argparse
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SERVE = os.path.join(REPO_ROOT, 'serve.py')
+
+DEFAULTS = {
+    'host': '0.0.0.0',
+    'workers': 1,
+    'health': '/',
+    'probe_interval': 10,
+    'probe_timeout': 5,
+    'probe_failures': 3,
+    'ready_timeout': 30,
+    'drain_timeout': 30,
+    'max_backoff': 60,
+    'env': {},
+}
+
+# A worker that stays up this long is considered healthy again
+STABLE_SECONDS = 60
+
+
+def log(message):
+    print(f'[supervisor {time.strftime("%H:%M:%S")}] {message}', flush=True)
+
+
+def load_manifest(path):
+    """Service definitions with manifest-wide defaults applied.
+
+    A service with "count": N is expanded into N services; "{i}" in its name
+    and script is replaced with 1..N (format specs such as "{i:03d}" work)
+    and the ports run upward from "port".
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    defaults = dict(DEFAULTS)
+    defaults.update({k: v for k, v in manifest.items() if k != 'services'})
+
+    services = []
+    for entry in manifest['services']:
+        if not entry.get('enabled', True):
+            continue
+        entry = {**defaults, **entry}
+        count = entry.pop('count', None)
+        if count is None:
+            services.append(entry)
+            continue
+        for i in range(1, count + 1):
+            services.append({
+                **entry,
+                'name': entry['name'].format(i=i),
+                'script': entry['script'].format(i=i),
+                'port': entry['port'] + i - 1,
+            })
+    return services
+
+
+class Worker:
+    def __init__(self, process):
+        self.process = process
+        self.started = time.monotonic()
+
+
+class Service:
+    """One script served on one port by a set of worker processes"""
+
+    def __init__(self, config):
+        self.config = config
+        self.name = config['name']
+        self.workers = []
+        self.failures = 0
+        self.probe_failures = 0
+        self.next_probe = time.monotonic() + config['ready_timeout']
+        self.pending_restarts = []
+        # (process, kill deadline) for replaced workers still finishing their requests
+        self.draining = []
+        self.socket = None
+
+    def bind(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.config['host'], self.config['port']))
+        sock.listen(128)
+        sock.set_inheritable(True)
+        self.socket = sock
+
+    def run_init(self):
+        """Run the service's one-off setup function (e.g. init_db) before any worker starts"""
+        function = self.config.get('init')
+        if not function:
+            return
+        log(f'{self.name}: running {function}()')
+        subprocess.run([sys.executable, SERVE, self.config['script'], '--call', function],
+                       cwd=REPO_ROOT, env=self.env(), check=True)
+
+    def env(self):
+        env = dict(os.environ)
+        env.update({k: str(v) for k, v in self.config['env'].items()})
+        return env
+
+    def spawn(self):
+        """Start one worker and wait until it serves; returns the Worker or None"""
+        read_fd, write_fd = os.pipe()
+        fd = self.socket.fileno()
+        process = subprocess.Popen(
+            [sys.executable, SERVE, self.config['script'], '--fd', str(fd), '--ready-fd', str(write_fd),
+             '--drain-timeout', str(self.config['drain_timeout'])],
+            cwd=REPO_ROOT, env=self.env(), pass_fds=(fd, write_fd))
+        os.close(write_fd)
+        try:
+            ready, _, _ = select.select([read_fd], [], [], self.config['ready_timeout'])
+            ok = bool(ready) and os.read(read_fd, 1) == b'1'
+        finally:
+            os.close(read_fd)
+        if not ok:
+            log(f'{self.name}: worker {process.pid} did not become ready')
+            self.terminate(process)
+            return None
+        return Worker(process)
+
+    def terminate(self, process, timeout=None):
+        """SIGTERM a worker, let it drain, then kill it if it is still running"""
+        if process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout if timeout is not None else self.config['drain_timeout'] + 5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def drain(self, process):
+        """SIGTERM a replaced worker without waiting; reap() collects it"""
+        if process.poll() is not None:
+            return
+        process.terminate()
+        self.draining.append((process, time.monotonic() + self.config['drain_timeout'] + 5))
+
+    def reap_draining(self):
+        """Collect drained workers and kill those past their deadline"""
+        now = time.monotonic()
+        for entry in list(self.draining):
+            process, deadline = entry
+            if process.poll() is None:
+                if now < deadline:
+                    continue
+                log(f'{self.name}: worker {process.pid} did not drain in time, killing it')
+                process.kill()
+                process.wait()
+            self.draining.remove(entry)
+
+    def start(self):
+        self.bind()
+        self.run_init()
+        for _ in range(self.config['workers']):
+            worker = self.spawn()
+            if worker:
+                self.workers.append(worker)
+            else:
+                self.schedule_restart()
+        log(f'{self.name}: {len(self.workers)} worker(s) on port {self.config["port"]}')
+
+    def schedule_restart(self):
+        delay = min(self.config['max_backoff'], 2 ** self.failures)
+        self.failures += 1
+        self.pending_restarts.append(time.monotonic() + delay)
+        log(f'{self.name}: restarting a worker in {delay}s')
+
+    def reap(self):
+        """Replace workers that exited on their own and collect drained ones"""
+        self.reap_draining()
+        for worker in list(self.workers):
+            code = worker.process.poll()
+            if code is None:
+                if time.monotonic() - worker.started > STABLE_SECONDS:
+                    self.failures = 0
+                continue
+            self.workers.remove(worker)
+            log(f'{self.name}: worker {worker.process.pid} exited with {code}')
+            self.schedule_restart()
+
+        now = time.monotonic()
+        for due in sorted(self.pending_restarts):
+            if due > now:
+                break
+            self.pending_restarts.remove(due)
+            worker = self.spawn()
+            if worker:
+                self.workers.append(worker)
+            else:
+                self.schedule_restart()
+
+    def probe(self):
+        """Health-check the service; roll it after probe_failures failures in a row"""
+        now = time.monotonic()
+        if now < self.next_probe:
+            return
+        self.next_probe = now + self.config['probe_interval']
+        url = f'http://127.0.0.1:{self.config["port"]}{self.config["health"]}'
+        try:
+            with urllib.request.urlopen(url, timeout=self.config['probe_timeout']) as response:
+                healthy = response.status < 500
+        except urllib.error.HTTPError as e:
+            healthy = e.code < 500
+        except (urllib.error.URLError, OSError):
+            healthy = False
+
+        if healthy:
+            self.probe_failures = 0
+            return
+        self.probe_failures += 1
+        log(f'{self.name}: health probe failed ({self.probe_failures}/{self.config["probe_failures"]})')
+        if self.probe_failures >= self.config['probe_failures']:
+            self.probe_failures = 0
+            self.rolling_restart()
+
+    def rolling_restart(self):
+        """Replace workers one at a time; each new one serves before the old one drains"""
+        log(f'{self.name}: rolling restart')
+        for old in list(self.workers):
+            new = self.spawn()
+            if new is None:
+                log(f'{self.name}: rolling restart aborted, keeping the remaining workers')
+                return
+            self.workers.append(new)
+            self.workers.remove(old)
+            self.drain(old.process)
+        self.failures = 0
+        log(f'{self.name}: rolling restart done')
+
+    def stop(self):
+        processes = [worker.process for worker in self.workers] + [process for process, _ in self.draining]
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            self.terminate(process)
+        self.workers = []
+        self.draining = []
+        if self.socket:
+            self.socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Test Grader servers from one manifest')
+    parser.add_argument('--manifest', default=os.path.join(REPO_ROOT, 'fleet.json'))
+    parser.add_argument('--only', help='comma-separated service names to run')
+    args = parser.parse_args()
+
+    configs = load_manifest(args.manifest)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(',')}
+        configs = [c for c in configs if c['name'] in wanted]
+    if not configs:
+        sys.exit('❌ No services to run')
+
+    signals = []
+    signal.signal(signal.SIGHUP, lambda signum, frame: signals.append('reload'))
+    signal.signal(signal.SIGTERM, lambda signum, frame: signals.append('stop'))
+    signal.signal(signal.SIGINT, lambda signum, frame: signals.append('stop'))
+
+    services = [Service(config) for config in configs]
+    try:
+        for service in services:
+            service.start()
+        log(f'running {len(services)} service(s), pid {os.getpid()}')
+
+        while True:
+            while signals:
+                action = signals.pop(0)
+                if action == 'stop':
+                    return
+                for service in services:
+                    service.rolling_restart()
+            for service in services:
+                service.reap()
+                service.probe()
+            time.sleep(0.5)
+    finally:
+        log('stopping')
+        for service in services:
+            service.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Copy account_store.py into the four account servers.
+
+test.html offers each account server as a single-file download, so a server
+carries its own copy of the store between the BEGIN and END markers rather
+than importing account_store. Edit account_store.py, then run:
+  python sync_account_store.py           # rewrite the inlined copies
+  python sync_account_store.py --check   # exit 1 if a copy is out of date
+"""
+
+import argparse
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(REPO_ROOT, 'account_store.py')
+SERVERS = [os.path.join(REPO_ROOT, f'test grader v{v}.0.0 account server.py') for v in (10, 11, 12, 13)]
+
+BEGIN = '# --- begin account_store.py (inlined; edit that file and run sync_account_store.py) ---\n'
+END = '# --- end account_store.py ---\n'
+
+
+def inlined_block():
+    """account_store.py without its module docstring, between the markers"""
+    with open(SOURCE) as f:
+        source = f.read()
+    body = source.split('"""', 2)[2].strip('\n')
+    return BEGIN + body + '\n' + END
+
+
+def current_block(content):
+    start = content.index(BEGIN)
+    return start, content.index(END, start) + len(END)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true', help='only report copies that are out of date')
+    args = parser.parse_args()
+
+    block = inlined_block()
+    stale = []
+    for path in SERVERS:
+        with open(path) as f:
+            content = f.read()
+        start, end = current_block(content)
+        if content[start:end] == block:
+            continue
+        stale.append(os.path.basename(path))
+        if not args.check:
+            with open(path, 'w') as f:
+                f.write(content[:start] + block + content[end:])
+            print(f'Updated {os.path.basename(path)}')
+
+    if args.check and stale:
+        sys.exit('❌ Out of date: ' + ', '.join(stale))
+    if not stale:
+        print('✅ Account servers are up to date')
+
+
+if __name__ == '__main__':
+    main()
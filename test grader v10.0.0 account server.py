@@ -2,11 +2,99 @@ from flask import Flask, render_template_string, request, jsonify, session, redi
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import json
+# --- begin account_store.py (inlined; edit that file and run sync_account_store.py) ---
+import os
+import sqlite3
+import threading
+
+
+class UserStore:
+    """Accounts keyed by email, persisted in SQLite (WAL mode) so they survive
+    restarts and are shared by every worker process.
+
+    Behaves like the dict it replaces. All accounts are loaded into memory on
+    start; an email missing from memory is looked up in the database, since
+    another worker may have created it. With no path it is a plain
+    per-process dict.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        if path:
+            conn = self._conn()
+            with conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS users '
+                             '(email TEXT PRIMARY KEY, name TEXT, password TEXT NOT NULL)')
+            for email, name, password in conn.execute('SELECT email, name, password FROM users'):
+                self.cache[email] = {'name': name, 'email': email, 'password': password}
+
+    def _conn(self):
+        # One connection per thread and process; connections must not cross a fork
+        if getattr(self.local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return self.local.conn
+
+    def get(self, email, default=None):
+        user = self.cache.get(email)
+        if user is None and self.path:
+            row = self._conn().execute('SELECT name, password FROM users WHERE email = ?', (email,)).fetchone()
+            if row:
+                user = self.cache[email] = {'name': row[0], 'email': email, 'password': row[1]}
+        return user if user is not None else default
+
+    def __contains__(self, email):
+        return self.get(email) is not None
+
+    def __getitem__(self, email):
+        user = self.get(email)
+        if user is None:
+            raise KeyError(email)
+        return user
+
+    def __setitem__(self, email, user):
+        if self.path:
+            with self._conn() as conn:
+                conn.execute('INSERT OR REPLACE INTO users (email, name, password) VALUES (?, ?, ?)',
+                             (email, user.get('name'), user['password']))
+        self.cache[email] = user
+
+    def add(self, email, user):
+        """Create the account unless the email is taken in any worker; returns True if created"""
+        if self.path:
+            with self._conn() as conn:
+                cursor = conn.execute('INSERT OR IGNORE INTO users (email, name, password) VALUES (?, ?, ?)',
+                                      (email, user.get('name'), user['password']))
+            if cursor.rowcount == 0:
+                return False
+        else:
+            with self.lock:
+                if email in self.cache:
+                    return False
+        self.cache[email] = user
+        return True
+
+    def __len__(self):
+        if self.path:
+            return self._conn().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+        return len(self.cache)
+
+
+def open_store(default_path):
+    """UserStore for ACCOUNT_STORE or default_path; ACCOUNT_STORE=memory keeps accounts per process"""
+    path = os.environ.get('ACCOUNT_STORE', default_path)
+    return UserStore(None if path == 'memory' else path)
+# --- end account_store.py ---
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'v10-secret-key-change-in-production'
 
-USERS = {}
+USERS = open_store('accounts_v10.db')
 GRADES = {}
 
 HTML_TEMPLATE = '''
@@ -184,11 +272,13 @@ def api_signup():
     if email in USERS:
         return jsonify({'success': False, 'error': 'Email already registered'})
     
-    USERS[email] = {
+    # add() also refuses the email if another worker registered it meanwhile
+    if not USERS.add(email, {
         'name': data.get('name'),
         'email': email,
         'password': generate_password_hash(data.get('password'))
-    }
+    }):
+        return jsonify({'success': False, 'error': 'Email already registered'})
     
     return jsonify({'success': True, 'user': {'name': USERS[email]['name'], 'email': email}})
 
@@ -1,6 +1,8 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, render_template_string, request, jsonify, Response
 from datetime import datetime
 import sqlite3
+import gzip
+import hashlib
 
 app = Flask(__name__)
 DATABASE = 'grades_v11.db'
@@ -72,9 +74,23 @@ document.getElementById('f').addEventListener('submit', async (e) => {
 });
 </script></body></html>'''
 
+# The page has no template variables: render it once at startup and serve the
+# precomputed bytes (and a gzip variant) instead of compiling it on every hit
+with app.app_context():
+    INDEX_HTML = render_template_string(HTML).encode('utf-8')
+INDEX_GZIP = gzip.compress(INDEX_HTML, 9, mtime=0)
+INDEX_ETAG = hashlib.sha1(INDEX_HTML).hexdigest()[:16]
+
 @app.route('/')
 def index():
-    return render_template_string(HTML)
+    gzipped = request.accept_encodings['gzip'] > 0
+    response = Response(INDEX_GZIP if gzipped else INDEX_HTML, mimetype='text/html')
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.set_etag(INDEX_ETAG + ('-gzip' if gzipped else ''))
+    return response.make_conditional(request)
 
 @app.route('/api/grade', methods=['POST'])
 def grade():
@@ -3,7 +3,7 @@ import sys
 import json
 import csv
 from datetime import datetime
-import statistics
+from bisect import bisect_right, insort
 
 # Test Grader v12.0.0 - Professional Plus Edition
 # Advanced grading with export features and analytics
@@ -20,11 +20,129 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+class GradeStatistics:
+    """Running statistics updated in a single pass as grades arrive.
+
+    Welford's algorithm keeps the mean and variance, and a histogram of exact
+    scores (kept in sorted order) answers mode, median and percentile queries
+    by walking distinct scores instead of re-sorting every grade.
+    """
+    def __init__(self, scores=()):
+        self.clear()
+        for score in scores:
+            self.add(score)
+    
+    def clear(self):
+        """Reset all accumulators"""
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._histogram = {}
+        self._distinct = []
+        # Position of each score's first occurrence, to break mode ties
+        self._first_seen = {}
+        self._mode = None
+        self._mode_count = 0
+    
+    def add(self, score):
+        """Fold one score into the statistics"""
+        self.count += 1
+        delta = score - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (score - self._mean)
+        
+        if self.min is None or score < self.min:
+            self.min = score
+        if self.max is None or score > self.max:
+            self.max = score
+        
+        seen = self._histogram.get(score, 0) + 1
+        self._histogram[score] = seen
+        if seen == 1:
+            insort(self._distinct, score)
+            self._first_seen[score] = self.count
+        # On a tie the score seen first wins, like statistics.mode
+        if seen > self._mode_count or (
+                seen == self._mode_count and self._first_seen[score] < self._first_seen[self._mode]):
+            self._mode, self._mode_count = score, seen
+    
+    @property
+    def mean(self):
+        return self._mean
+    
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two grades)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0
+    
+    @property
+    def std_dev(self):
+        return self.variance ** 0.5
+    
+    @property
+    def mode(self):
+        return self._mode
+    
+    def _value_at(self, rank):
+        """Score at a 0-based position in sorted order"""
+        seen = 0
+        for score in self._distinct:
+            seen += self._histogram[score]
+            if rank < seen:
+                return score
+        return self.max
+    
+    @property
+    def median(self):
+        if not self.count:
+            return None
+        middle = self.count // 2
+        if self.count % 2:
+            return self._value_at(middle)
+        return (self._value_at(middle - 1) + self._value_at(middle)) / 2
+    
+    def percentile(self, p):
+        """Score at percentile p (0-100), linearly interpolated between ranks"""
+        if not self.count:
+            return None
+        position = (self.count - 1) * p / 100
+        lower = int(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return low_value
+        return low_value + (self._value_at(lower + 1) - low_value) * (position - lower)
+    
+    def percentile_rank(self, score):
+        """Percentage of grades less than or equal to score"""
+        if not self.count:
+            return 0.0
+        below = bisect_right(self._distinct, score)
+        at_or_below = sum(self._histogram[s] for s in self._distinct[:below])
+        return at_or_below / self.count * 100
+    
+    def summary(self):
+        """Statistics in the shape returned by calculate_statistics"""
+        return {
+            'mean': self.mean,
+            'median': self.median,
+            'mode': self.mode,
+            'std_dev': self.std_dev,
+            'variance': self.variance,
+            'min': self.min,
+            'max': self.max,
+            'range': self.max - self.min,
+            'count': self.count
+        }
+
 class TestGraderV12:
     def __init__(self):
         self.all_grades = []
         self.session_start = datetime.now()
         self.grade_history = []
+        self.stats = GradeStatistics()
+        self.letter_counts = {}
         
     def clear_screen(self):
         """Clear the terminal screen"""
@@ -97,29 +215,12 @@ class TestGraderV12:
         }
         return gpa_map.get(letter_grade, 0.0)
     
-    def calculate_statistics(self, grades_list):
-        """Calculate comprehensive statistics"""
-        if not grades_list:
+    def calculate_statistics(self, grades_list=None):
+        """Calculate comprehensive statistics (session totals when no list is given)"""
+        stats = self.stats if grades_list is None else GradeStatistics(grades_list)
+        if not stats.count:
             return None
-            
-        stats = {
-            'mean': statistics.mean(grades_list),
-            'median': statistics.median(grades_list),
-            'mode': None,
-            'std_dev': statistics.stdev(grades_list) if len(grades_list) > 1 else 0,
-            'variance': statistics.variance(grades_list) if len(grades_list) > 1 else 0,
-            'min': min(grades_list),
-            'max': max(grades_list),
-            'range': max(grades_list) - min(grades_list),
-            'count': len(grades_list)
-        }
-        
-        try:
-            stats['mode'] = statistics.mode(grades_list)
-        except:
-            stats['mode'] = "N/A"
-            
-        return stats
+        return stats.summary()
     
     def export_to_csv(self, data, filename=None):
         """Export grades to CSV file"""
@@ -166,8 +267,7 @@ class TestGraderV12:
             print(f"{Colors.WARNING}No grades to analyze yet.{Colors.ENDC}")
             return
             
-        scores = [g['score'] for g in self.all_grades]
-        stats = self.calculate_statistics(scores)
+        stats = self.calculate_statistics()
         
         print("\n" + Colors.BOLD + Colors.OKCYAN + "📊 ANALYTICS DASHBOARD" + Colors.ENDC)
         print("="*65)
@@ -184,23 +284,19 @@ class TestGraderV12:
         
         # Grade Distribution
         print(Colors.BOLD + "\n📊 Grade Distribution:" + Colors.ENDC)
-        grade_counts = {}
-        for g in self.all_grades:
-            grade = g['letter_grade']
-            grade_counts[grade] = grade_counts.get(grade, 0) + 1
-        
         for grade in ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']:
-            if grade in grade_counts:
-                count = grade_counts[grade]
-                percentage = (count / len(self.all_grades)) * 100
+            if grade in self.letter_counts:
+                count = self.letter_counts[grade]
+                percentage = (count / stats['count']) * 100
                 bar = '█' * int(percentage / 2)
                 print(f"  {grade:3} [{count:2}] {bar} {percentage:.1f}%")
         
         # Performance Trends
         if len(self.all_grades) > 1:
             print(Colors.BOLD + "\n📈 Performance Trend:" + Colors.ENDC)
-            recent_avg = statistics.mean(scores[-5:])
-            overall_avg = statistics.mean(scores)
+            recent = self.all_grades[-5:]
+            recent_avg = sum(g['score'] for g in recent) / len(recent)
+            overall_avg = stats['mean']
             trend = recent_avg - overall_avg
             
             if trend > 0:
@@ -234,9 +330,8 @@ class TestGraderV12:
         print(f"[{bar_color}{'█' * filled_bars}{Colors.ENDC}{'░' * empty_bars}]")
         
         # Show percentile
-        if self.all_grades:
-            scores = [g['score'] for g in self.all_grades]
-            percentile = sum(1 for s in scores if s <= score) / len(scores) * 100
+        if self.stats.count:
+            percentile = self.stats.percentile_rank(score)
             print(f"Percentile: {percentile:.1f}th (better than {percentile:.0f}% of all grades)")
         
         print()
@@ -302,6 +397,8 @@ class TestGraderV12:
                         'gpa': gpa
                     }
                     self.all_grades.append(grade_entry)
+                    self.stats.add(grade)
+                    self.letter_counts[letter_grade] = self.letter_counts.get(letter_grade, 0) + 1
                     
                     # Display result
                     print("\n" + "="*65)
@@ -358,6 +455,8 @@ class TestGraderV12:
                     
             elif choice == "7":
                 self.all_grades.clear()
+                self.stats.clear()
+                self.letter_counts.clear()
                 self.print_banner()
                 print(f"{Colors.OKGREEN}✓ Session cleared!{Colors.ENDC}")
                 
@@ -4,58 +4,158 @@ Advanced Features: Graphical reporting, multiple students, weighted categories,
 """
 
 import json
+import multiprocessing
 import os
+import re
+import sys
+import uuid
+from array import array
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from types import MappingProxyType
 from typing import Dict, List, Tuple # type: ignore
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages 
 
+def _as_number(value: float):
+    """Give back whole numbers as ints, as they were entered (95/100, not 95.0/100.0)"""
+    return int(value) if value.is_integer() else value
+
 class GradeCategory:
-    """Represents a grading category with weight"""
+    """Represents a grading category with weight.
+
+    Assignments are stored column-wise: interned names in a list and scores and
+    max scores in float arrays, about 20 bytes per assignment instead of a dict.
+    """
+    __slots__ = ('name', '_weight', '_names', '_scores', '_max_scores', '_percentage_sum', '_students')
+    
     def __init__(self, name: str, weight: float):
-        self.name = name
-        self.weight = weight
-        self.assignments = []
+        self.name = sys.intern(name)
+        self._weight = weight
+        self._names: List[str] = []
+        self._scores = array('d')
+        self._max_scores = array('d')
+        # Running total of assignment percentages, so the average is O(1)
+        self._percentage_sum = 0.0
+        # Students whose cached final grade depends on this category
+        self._students = []
+    
+    @property
+    def assignments(self) -> List[dict]:
+        """Assignments as dicts (name, score, max_score, percentage), built on each access"""
+        return [
+            {
+                'name': name,
+                'score': _as_number(score),
+                'max_score': _as_number(max_score),
+                'percentage': (score / max_score) * 100
+            }
+            for name, score, max_score in zip(self._names, self._scores, self._max_scores)
+        ]
+    
+    @property
+    def weight(self) -> float:
+        return self._weight
+    
+    @weight.setter
+    def weight(self, weight: float):
+        self._weight = weight
+        self._changed('weight', weight)
+    
+    def _changed(self, kind: str, *values):
+        """Drop owning students' cached final grades and journal the change for each"""
+        journals = []
+        for student in self._students:
+            student._final_grade = None
+            if student._journal is not None:
+                student._journal.append([kind, student.student_id, self.name, *values])
+                if student._journal not in journals:
+                    journals.append(student._journal)
+        # Only after every student's event is written: a snapshot taken midway
+        # would already hold the change, and the rest would be replayed twice
+        for journal in journals:
+            journal.maybe_compact()
     
     def add_assignment(self, name: str, score: float, max_score: float):
         """Add an assignment to this category"""
-        self.assignments.append({
-            'name': name,
-            'score': score,
-            'max_score': max_score,
-            'percentage': (score / max_score) * 100
-        })
+        percentage = (score / max_score) * 100
+        self._names.append(sys.intern(name))
+        self._scores.append(score)
+        self._max_scores.append(max_score)
+        self._percentage_sum += percentage
+        self._changed('assignment', name, score, max_score)
     
     def get_category_average(self) -> float:
         """Calculate average for this category"""
-        if not self.assignments:
+        if not self._scores:
             return 0.0
-        total_percentage = sum(a['percentage'] for a in self.assignments)
-        return total_percentage / len(self.assignments)
+        return self._percentage_sum / len(self._scores)
+    
+    def to_record(self) -> list:
+        """[name, weight, names, scores, max_scores], as stored in a course file"""
+        return [self.name, self._weight, self._names, self._scores.tolist(), self._max_scores.tolist()]
+    
+    @classmethod
+    def from_record(cls, record: list) -> 'GradeCategory':
+        name, weight, names, scores, max_scores = record
+        category = cls(name, weight)
+        category._names = [sys.intern(n) for n in names]
+        category._scores = array('d', scores)
+        category._max_scores = array('d', max_scores)
+        # Same order of additions as add_assignment, so the average is bit-identical
+        for score, max_score in zip(category._scores, category._max_scores):
+            category._percentage_sum += (score / max_score) * 100
+        return category
 
 class Student:
     """Represents a student with their grades"""
+    __slots__ = ('name', 'student_id', '_categories', '_final_grade', '_journal')
+    
     def __init__(self, name: str, student_id: str):
         self.name = name
         self.student_id = student_id
-        self.categories: Dict[str, GradeCategory] = {}
+        self._categories: Dict[str, GradeCategory] = {}
+        # Cached by calculate_final_grade(); reset when a category changes
+        self._final_grade = None
+        # Set while the student belongs to a course that journals its changes
+        self._journal = None
+    
+    @property
+    def categories(self):
+        """Categories by name, read-only; add_category() keeps the cached grade and journal in step"""
+        return MappingProxyType(self._categories)
     
     def add_category(self, category: GradeCategory):
         """Add a grading category"""
-        self.categories[category.name] = category
+        replaced = self._categories.get(category.name)
+        if replaced is not None and replaced is not category:
+            replaced._students.remove(self)
+        if replaced is not category:
+            category._students.append(self)
+        self._categories[category.name] = category
+        self._final_grade = None
+        if self._journal is not None:
+            self._journal.append(['category', self.student_id, category.to_record()])
+            self._journal.maybe_compact()
     
     def calculate_final_grade(self) -> float:
         """Calculate weighted final grade"""
-        total_weight = sum(cat.weight for cat in self.categories.values())
+        if self._final_grade is not None:
+            return self._final_grade
+        
+        total_weight = sum(cat.weight for cat in self._categories.values())
         if total_weight == 0:
+            self._final_grade = 0.0
             return 0.0
         
         weighted_sum = sum(
             cat.get_category_average() * cat.weight 
-            for cat in self.categories.values()
+            for cat in self._categories.values()
         )
-        return weighted_sum / total_weight
+        self._final_grade = weighted_sum / total_weight
+        return self._final_grade
     
     def get_letter_grade(self) -> str:
         """Convert numerical grade to letter grade"""
@@ -72,17 +172,355 @@ class Student:
         elif grade >= 63: return 'D'
         elif grade >= 60: return 'D-'
         else: return 'F'
+    
+    def to_record(self) -> dict:
+        return {
+            'id': self.student_id,
+            'name': self.name,
+            'categories': [category.to_record() for category in self.categories.values()]
+        }
+    
+    @classmethod
+    def from_record(cls, record: dict) -> 'Student':
+        student = cls(record['name'], record['id'])
+        for category_record in record['categories']:
+            student.add_category(GradeCategory.from_record(category_record))
+        return student
+
+COURSE_FORMAT = 'grade-course'
+COURSE_FORMAT_VERSION = 1
+
+class Journal:
+    """Append-only log of the changes made to a course since its last snapshot.
+
+    Each line is one compact JSON event: a student added (with its record), a
+    category added, an assignment added or a category weight changed. The
+    first line names the snapshot the events apply to, so a journal left over
+    from before a compaction is never replayed twice. Once a change has been
+    fully journaled, maybe_compact() calls compact() if the journal has grown
+    past its limit; compact() writes a new snapshot and resets the journal.
+    The limit follows the snapshot's size, so appends stay O(1) amortized.
+    """
+    
+    MIN_LIMIT = 1 << 20
+    
+    def __init__(self, path: str, compact=None):
+        self.path = path
+        self.compact = compact
+        self.base = None
+        self.size = 0
+        self.limit = self.MIN_LIMIT
+        self._file = None
+        self._compacting = False
+        # End of the last complete line, as found by read()
+        self._valid_size = None
+    
+    def read(self, base: str):
+        """Events recorded against snapshot `base`; None if the journal is missing or stale"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            header = f.readline()
+            try:
+                if json.loads(header).get('base') != base:
+                    return None
+            except ValueError:
+                return None
+            events = []
+            valid_size = len(header)
+            for line in f:
+                # A line without its newline is a write cut short; resume() cuts it off
+                if not line.endswith(b'\n'):
+                    break
+                events.append(json.loads(line))
+                valid_size += len(line)
+            self._valid_size = valid_size
+            return events
+    
+    def resume(self, base: str, limit: int = 0):
+        """Keep appending to the journal for snapshot `base` that read() just replayed"""
+        self.close()
+        self.base = base
+        self.limit = max(self.MIN_LIMIT, limit)
+        self._file = open(self.path, 'ab')
+        if self._valid_size is not None:
+            # Drop a torn last line, so the next event starts on a line of its own
+            self._file.truncate(self._valid_size)
+            self._file.seek(0, os.SEEK_END)
+            self._valid_size = None
+        self.size = self._file.tell()
+    
+    def reset(self, base: str, limit: int = 0):
+        """Start an empty journal on top of snapshot `base`"""
+        self.close()
+        self.base = base
+        self.limit = max(self.MIN_LIMIT, limit)
+        self._file = open(self.path, 'wb')
+        self._file.write(json.dumps({'base': base}).encode('utf-8') + b'\n')
+        self._file.flush()
+        self.size = self._file.tell()
+    
+    def append(self, event: list):
+        line = json.dumps(event, separators=(',', ':')).encode('utf-8') + b'\n'
+        self._file.write(line)
+        self._file.flush()
+        self.size += len(line)
+    
+    def maybe_compact(self):
+        """Compact if the journal has outgrown its limit; call once a change is fully journaled"""
+        if self.size > self.limit and self.compact and not self._compacting:
+            self._compacting = True
+            try:
+                self.compact()
+            finally:
+                self._compacting = False
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class LazyStudents(MutableMapping):
+    """Students of a course file, parsed from disk on first access.
+
+    A course file is line-delimited JSON: a header line, one compact line per
+    student, an index line giving each student's byte offset and length, and a
+    final fixed-width line with the index's offset. Opening a course reads only
+    the header and the index; each student's line is parsed when first looked
+    up. Students added or replaced in memory take precedence over the file.
+    """
+    
+    def __init__(self, path: str = None, index: Dict[str, Tuple[int, int]] = None):
+        self.path = path
+        # student_id -> (offset, length) in the file, or None for in-memory only
+        self._index = dict(index or {})
+        self._loaded: Dict[str, Student] = {}
+        self._file = None
+        # Given to students as they are loaded, so their changes are journaled
+        self.journal = None
+    
+    @classmethod
+    def open(cls, path: str) -> Tuple[dict, 'LazyStudents']:
+        """Read a course file's header and index; returns (header, students)"""
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != COURSE_FORMAT or header.get('version') != COURSE_FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {COURSE_FORMAT_VERSION} course file")
+            f.seek(-21, os.SEEK_END)
+            f.seek(int(f.read(20)))
+            entries = json.loads(f.readline())['index']
+        return header, cls(path, {student_id: (offset, length) for student_id, offset, length in entries})
+    
+    def raw(self, student_id: str):
+        """The student's line from the file, or None if it is not there or was loaded"""
+        if student_id in self._loaded:
+            return None
+        location = self._index.get(student_id)
+        if location is None:
+            return None
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        offset, length = location
+        self._file.seek(offset)
+        return self._file.read(length)
+    
+    def __getitem__(self, student_id: str) -> Student:
+        student = self._loaded.get(student_id)
+        if student is None:
+            line = self.raw(student_id)
+            if line is None:
+                raise KeyError(student_id)
+            student = self._loaded[student_id] = Student.from_record(json.loads(line))
+            student._journal = self.journal
+        return student
+    
+    def __setitem__(self, student_id: str, student: Student):
+        self._loaded[student_id] = student
+        self._index.setdefault(student_id, None)
+    
+    def __delitem__(self, student_id: str):
+        del self._index[student_id]
+        self._loaded.pop(student_id, None)
+    
+    def __contains__(self, student_id) -> bool:
+        return student_id in self._index
+    
+    def __iter__(self):
+        return iter(self._index)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def loaded(self) -> int:
+        """Number of students materialized so far"""
+        return len(self._loaded)
+    
+    def attach(self, journal: Journal):
+        """Journal the changes of every student, loaded now or later"""
+        self.journal = journal
+        for student in self._loaded.values():
+            student._journal = journal
+    
+    def rebase(self, path: str, index: Dict[str, Tuple[int, int]]):
+        """Point at a newly written course file; loaded students stay in memory"""
+        self.close()
+        self.path = path
+        self._index = dict(index)
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def draw_student_performance(fig, axes, student: Student, course_name: str):
+    """Draw a student's four report charts into fig's 2x2 axes"""
+    (ax1, ax2), (ax3, ax4) = axes
+    fig.suptitle(f'Grade Report: {student.name} - {course_name}', 
+                 fontsize=16, fontweight='bold')
+    
+    # 1. Category Averages Bar Chart
+    categories = list(student.categories.keys())
+    averages = [cat.get_category_average() for cat in student.categories.values()]
+    weights = [cat.weight for cat in student.categories.values()]
+    
+    colors = plt.cm.viridis(np.linspace(0, 1, len(categories)))
+    bars = ax1.bar(categories, averages, color=colors, alpha=0.7, edgecolor='black')
+    ax1.set_ylabel('Average (%)', fontsize=12)
+    ax1.set_title('Category Averages', fontsize=14, fontweight='bold')
+    ax1.set_ylim(0, 100)
+    ax1.axhline(y=70, color='r', linestyle='--', label='Passing (70%)')
+    ax1.legend()
+    ax1.grid(axis='y', alpha=0.3)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}%', ha='center', va='bottom', fontsize=10)
+    
+    # 2. Weighted Contribution Pie Chart
+    final_grade = student.calculate_final_grade()
+    contributions = [
+        (cat.get_category_average() * cat.weight / 100) 
+        for cat in student.categories.values()
+    ]
+    
+    ax2.pie(contributions, labels=categories, autopct='%1.1f%%',
+            colors=colors, startangle=90)
+    ax2.set_title(f'Grade Contribution\nFinal: {final_grade:.2f}% ({student.get_letter_grade()})',
+                 fontsize=14, fontweight='bold')
+    
+    # 3. Assignment Scores Timeline
+    all_assignments = []
+    for cat_name, category in student.categories.items():
+        for i, assignment in enumerate(category.assignments):
+            all_assignments.append({
+                'name': f"{cat_name[:3]}-{assignment['name'][:10]}",
+                'percentage': assignment['percentage'],
+                'category': cat_name
+            })
+    
+    if all_assignments:
+        x_pos = range(len(all_assignments))
+        percentages = [a['percentage'] for a in all_assignments]
+        labels = [a['name'] for a in all_assignments]
+        
+        ax3.plot(x_pos, percentages, marker='o', linewidth=2, markersize=8)
+        ax3.axhline(y=final_grade, color='g', linestyle='--', 
+                   label=f'Final Average ({final_grade:.1f}%)')
+        ax3.axhline(y=70, color='r', linestyle='--', label='Passing (70%)')
+        ax3.set_xticks(x_pos)
+        ax3.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+        ax3.set_ylabel('Score (%)', fontsize=12)
+        ax3.set_title('Assignment Performance Timeline', fontsize=14, fontweight='bold')
+        ax3.set_ylim(0, 100)
+        ax3.legend()
+        ax3.grid(True, alpha=0.3)
+    
+    # 4. Grade Distribution (if comparing to class)
+    letter_grade = student.get_letter_grade()
+    grade_labels = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
+    student_index = grade_labels.index(letter_grade)
+    
+    # Create a mock distribution highlighting student's position
+    distribution = [0] * len(grade_labels)
+    distribution[student_index] = 1
+    
+    colors_dist = ['lightgray'] * len(grade_labels)
+    colors_dist[student_index] = 'gold'
+    
+    ax4.bar(grade_labels, distribution, color=colors_dist, edgecolor='black')
+    ax4.set_ylabel('Student Position', fontsize=12)
+    ax4.set_title(f'Current Letter Grade: {letter_grade}', 
+                 fontsize=14, fontweight='bold')
+    ax4.set_ylim(0, 1.5)
+    ax4.text(student_index, 1.1, 'YOU ARE HERE', ha='center', 
+            fontsize=12, fontweight='bold', color='darkred')
+    
+    fig.tight_layout()
+
+# The figure and settings of an export_all_reports() worker process
+_report_worker = {}
+
+def _init_report_worker(course_name: str, fmt: str, dpi: int):
+    """Pool initializer: render off-screen and build the one figure this worker reuses"""
+    plt.switch_backend('Agg')
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    _report_worker.update(course_name=course_name, fmt=fmt, dpi=dpi, fig=fig, axes=axes)
+
+def _render_report(record, path: str) -> str:
+    """Render one student's report to path, from its record or course file line"""
+    if isinstance(record, bytes):
+        record = json.loads(record)
+    student = Student.from_record(record)
+    fig, axes = _report_worker['fig'], _report_worker['axes']
+    for ax in axes.flat:
+        ax.clear()
+    course_name, fmt = _report_worker['course_name'], _report_worker['fmt']
+    draw_student_performance(fig, axes, student, course_name)
+    
+    options = {'format': fmt, 'dpi': _report_worker['dpi']}
+    if fmt == 'pdf':
+        options['metadata'] = {
+            'Title': f'Grade Report - {student.name}',
+            'Author': 'Grade Calculator v13.0.0',
+            'Subject': course_name,
+            'Keywords': 'Grades, Report, Education',
+            'CreationDate': datetime.now()
+        }
+    else:
+        options['bbox_inches'] = 'tight'
+    # Written under a temporary name, so an interrupted export never leaves a partial report
+    tmp_path = path + '.part'
+    try:
+        fig.savefig(tmp_path, **options)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
 
 class GradeCalculator:
     """Main grade calculator with reporting features"""
     def __init__(self, course_name: str):
         self.course_name = course_name
-        self.students: Dict[str, Student] = {}
-        self.data_file = f"{course_name.replace(' ', '_')}_grades.json"
+        self.students: MutableMapping = LazyStudents()
+        self.data_file = f"{course_name.replace(' ', '_')}_grades.course"
+        # Written by save_json() and read by load_data() when no course file exists yet
+        self.json_file = f"{course_name.replace(' ', '_')}_grades.json"
+        # Changes since the last save_data(); active once the course is saved or loaded
+        self.journal_file = f"{course_name.replace(' ', '_')}_grades.journal"
+        self.journal = None
     
     def add_student(self, student: Student):
         """Add a student to the course"""
         self.students[student.student_id] = student
+        if self.journal is not None:
+            student._journal = self.journal
+            self.journal.append(['student', student.to_record()])
+            self.journal.maybe_compact()
     
     def generate_student_report(self, student_id: str) -> str:
         """Generate text report for a student"""
@@ -123,91 +561,8 @@ class GradeCalculator:
             print("Student not found")
             return
         
-        student = self.students[student_id]
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle(f'Grade Report: {student.name} - {self.course_name}', 
-                     fontsize=16, fontweight='bold')
-        
-        # 1. Category Averages Bar Chart
-        categories = list(student.categories.keys())
-        averages = [cat.get_category_average() for cat in student.categories.values()]
-        weights = [cat.weight for cat in student.categories.values()]
-        
-        colors = plt.cm.viridis(np.linspace(0, 1, len(categories)))
-        bars = ax1.bar(categories, averages, color=colors, alpha=0.7, edgecolor='black')
-        ax1.set_ylabel('Average (%)', fontsize=12)
-        ax1.set_title('Category Averages', fontsize=14, fontweight='bold')
-        ax1.set_ylim(0, 100)
-        ax1.axhline(y=70, color='r', linestyle='--', label='Passing (70%)')
-        ax1.legend()
-        ax1.grid(axis='y', alpha=0.3)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.1f}%', ha='center', va='bottom', fontsize=10)
-        
-        # 2. Weighted Contribution Pie Chart
-        final_grade = student.calculate_final_grade()
-        contributions = [
-            (cat.get_category_average() * cat.weight / 100) 
-            for cat in student.categories.values()
-        ]
-        
-        ax2.pie(contributions, labels=categories, autopct='%1.1f%%',
-                colors=colors, startangle=90)
-        ax2.set_title(f'Grade Contribution\nFinal: {final_grade:.2f}% ({student.get_letter_grade()})',
-                     fontsize=14, fontweight='bold')
-        
-        # 3. Assignment Scores Timeline
-        all_assignments = []
-        for cat_name, category in student.categories.items():
-            for i, assignment in enumerate(category.assignments):
-                all_assignments.append({
-                    'name': f"{cat_name[:3]}-{assignment['name'][:10]}",
-                    'percentage': assignment['percentage'],
-                    'category': cat_name
-                })
-        
-        if all_assignments:
-            x_pos = range(len(all_assignments))
-            percentages = [a['percentage'] for a in all_assignments]
-            labels = [a['name'] for a in all_assignments]
-            
-            ax3.plot(x_pos, percentages, marker='o', linewidth=2, markersize=8)
-            ax3.axhline(y=final_grade, color='g', linestyle='--', 
-                       label=f'Final Average ({final_grade:.1f}%)')
-            ax3.axhline(y=70, color='r', linestyle='--', label='Passing (70%)')
-            ax3.set_xticks(x_pos)
-            ax3.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
-            ax3.set_ylabel('Score (%)', fontsize=12)
-            ax3.set_title('Assignment Performance Timeline', fontsize=14, fontweight='bold')
-            ax3.set_ylim(0, 100)
-            ax3.legend()
-            ax3.grid(True, alpha=0.3)
-        
-        # 4. Grade Distribution (if comparing to class)
-        letter_grade = student.get_letter_grade()
-        grade_labels = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
-        student_index = grade_labels.index(letter_grade)
-        
-        # Create a mock distribution highlighting student's position
-        distribution = [0] * len(grade_labels)
-        distribution[student_index] = 1
-        
-        colors_dist = ['lightgray'] * len(grade_labels)
-        colors_dist[student_index] = 'gold'
-        
-        ax4.bar(grade_labels, distribution, color=colors_dist, edgecolor='black')
-        ax4.set_ylabel('Student Position', fontsize=12)
-        ax4.set_title(f'Current Letter Grade: {letter_grade}', 
-                     fontsize=14, fontweight='bold')
-        ax4.set_ylim(0, 1.5)
-        ax4.text(student_index, 1.1, 'YOU ARE HERE', ha='center', 
-                fontsize=12, fontweight='bold', color='darkred')
-        
-        plt.tight_layout()
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        draw_student_performance(fig, axes, self.students[student_id], self.course_name)
         
         if save_path:
             plt.savefig(save_path, dpi=300, bbox_inches='tight')
@@ -302,8 +657,166 @@ class GradeCalculator:
         
         print(f"PDF report saved to {filename}")
     
+    def export_all_reports(self, out_dir: str, workers: int = None, fmt: str = 'pdf',
+                           dpi: int = 300, overwrite: bool = False, progress=print) -> dict:
+        """Render every student's report chart to out_dir/<student_id>.<fmt> (pdf or png).
+
+        Students are spread over a pool of `workers` processes (default: one
+        per CPU), each drawing off-screen into a single reused figure.
+        Reports already in out_dir are skipped unless overwrite is set, so
+        running it again after an interruption or failure renders only the
+        missing ones. progress is called with one line per finished student.
+        Returns the ids rendered, skipped and failed (with the error).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        result = {'rendered': [], 'skipped': [], 'failed': {}}
+        jobs = []
+        for student_id in self.students:
+            filename = re.sub(r'[^\w.-]', '_', student_id)
+            path = os.path.join(out_dir, f"{filename}.{fmt}")
+            if os.path.exists(path) and not overwrite:
+                result['skipped'].append(student_id)
+            else:
+                jobs.append((student_id, path))
+        if not jobs:
+            return result
+        
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        # Forked workers inherit this module as loaded, even when it was imported by path
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_report_worker,
+                                 initargs=(self.course_name, fmt, dpi)) as pool:
+            futures = {}
+            for student_id, path in jobs:
+                # Students never loaded are sent as their course file line, unparsed
+                record = self.students.raw(student_id) if isinstance(self.students, LazyStudents) else None
+                if record is None:
+                    record = self.students[student_id].to_record()
+                futures[pool.submit(_render_report, record, path)] = student_id
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                student_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result['failed'][student_id] = f"{type(e).__name__}: {e}"
+                    status = f"failed ({type(e).__name__}: {e})"
+                else:
+                    result['rendered'].append(student_id)
+                    status = "done"
+                if progress:
+                    progress(f"[{done}/{len(jobs)}] {student_id} {status}")
+        
+        return result
+    
     def save_data(self):
-        """Save all data to JSON file"""
+        """Save all data to the course file and start a fresh journal.
+
+        Students that were never loaded are copied over as stored, without
+        being parsed. The file is written beside the old one and then
+        swapped in, so a failed save leaves the previous data intact. After
+        the first save, changes are appended to the journal as they happen.
+        """
+        self.compact()
+        print(f"Data saved to {self.data_file}")
+    
+    def compact(self):
+        """Write a new snapshot of the course and empty the journal"""
+        # Each snapshot gets a new id; the journal records which one it extends
+        snapshot_id = uuid.uuid4().hex
+        tmp_path = self.data_file + '.tmp'
+        index = []
+        with open(tmp_path, 'wb') as f:
+            header = {'format': COURSE_FORMAT, 'version': COURSE_FORMAT_VERSION,
+                      'course_name': self.course_name, 'snapshot': snapshot_id}
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for student_id in self.students:
+                line = None
+                if isinstance(self.students, LazyStudents):
+                    line = self.students.raw(student_id)
+                if line is None:
+                    record = self.students[student_id].to_record()
+                    line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                index.append((student_id, f.tell(), len(line)))
+                f.write(line)
+            index_offset = f.tell()
+            f.write(json.dumps({'index': index}, separators=(',', ':')).encode('utf-8') + b'\n')
+            f.write(b'%020d\n' % index_offset)
+            size = f.tell()
+        
+        if isinstance(self.students, LazyStudents):
+            self.students.close()
+        os.replace(tmp_path, self.data_file)
+        if isinstance(self.students, LazyStudents):
+            self.students.rebase(self.data_file, {student_id: (offset, length) for student_id, offset, length in index})
+        
+        # A crash before this point leaves the old journal, which names the old snapshot and is ignored
+        self._journal().reset(snapshot_id, size)
+    
+    def _journal(self) -> Journal:
+        """The course's journal, attached to every student"""
+        if self.journal is None:
+            self.journal = Journal(self.journal_file, compact=self.compact)
+            self.students.attach(self.journal)
+        return self.journal
+    
+    def load_data(self):
+        """Open the course file and replay the journal on top of it.
+
+        Students are read from the course file on first access; those the
+        journal touches are loaded while it is replayed.
+        """
+        if self.journal is not None:
+            # Loading again: nothing replayed below may be journaled twice
+            self.journal.close()
+            self.students.attach(None)
+            self.journal = None
+
+        snapshot_id, size = None, 0
+        if os.path.exists(self.data_file):
+            header, students = LazyStudents.open(self.data_file)
+            # Students already added in memory take precedence over the file
+            for student_id, student in self.students.items():
+                students[student_id] = student
+            self.students = students
+            snapshot_id, size = header.get('snapshot'), os.path.getsize(self.data_file)
+            print(f"Data loaded from {self.data_file} ({len(students)} students)")
+        elif os.path.exists(self.json_file):
+            self.load_json()
+            snapshot_id = self._json_base()
+        
+        journal = Journal(self.journal_file, compact=self.compact)
+        events = journal.read(snapshot_id)
+        if events is None:
+            if snapshot_id is None and not os.path.exists(self.json_file):
+                print("No saved data found")
+            journal.reset(snapshot_id, size)
+        else:
+            for event in events:
+                self._replay(event)
+            journal.resume(snapshot_id, size)
+            print(f"Replayed {len(events)} journaled changes from {self.journal_file}")
+        self.journal = journal
+        self.students.attach(journal)
+    
+    def _replay(self, event: list):
+        kind = event[0]
+        if kind == 'student':
+            student = Student.from_record(event[1])
+            self.students[student.student_id] = student
+        elif kind == 'category':
+            self.students[event[1]].add_category(GradeCategory.from_record(event[2]))
+        elif kind == 'assignment':
+            _, student_id, category_name, name, score, max_score = event
+            self.students[student_id].categories[category_name].add_assignment(name, score, max_score)
+        elif kind == 'weight':
+            _, student_id, category_name, weight = event
+            self.students[student_id].categories[category_name].weight = weight
+        else:
+            raise ValueError(f"Unknown journal event {kind!r} in {self.journal_file}")
+    
+    def save_json(self):
+        """Save all data to an indented JSON file (the pre-v13 course format)"""
         data = {
             'course_name': self.course_name,
             'students': {}
@@ -323,18 +836,27 @@ class GradeCalculator:
             
             data['students'][student_id] = student_data
         
-        with open(self.data_file, 'w') as f:
+        with open(self.json_file, 'w') as f:
             json.dump(data, f, indent=2)
         
-        print(f"Data saved to {self.data_file}")
+        if self.journal is not None and (self.journal.base is None or self.journal.base.startswith('json:')):
+            # The JSON file is the snapshot the journal extends, and it now holds every journaled change
+            self.journal.reset(self._json_base())
+        
+        print(f"Data saved to {self.json_file}")
     
-    def load_data(self):
-        """Load data from JSON file"""
-        if not os.path.exists(self.data_file):
+    def _json_base(self) -> str:
+        """Names the JSON file's current contents, for a journal kept on top of it"""
+        stat = os.stat(self.json_file)
+        return f"json:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def load_json(self):
+        """Load every student from an indented JSON file"""
+        if not os.path.exists(self.json_file):
             print("No saved data found")
             return
         
-        with open(self.data_file, 'r') as f:
+        with open(self.json_file, 'r') as f:
             data = json.load(f)
         
         for student_id, student_data in data['students'].items():
@@ -352,7 +874,7 @@ class GradeCalculator:
             
             self.add_student(student)
         
-        print(f"Data loaded from {self.data_file}")
+        print(f"Data loaded from {self.json_file}")
 
 def demo_version_13():
     """Demo of version 13.0.0 features"""
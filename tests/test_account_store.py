@@ -0,0 +1,31 @@
+"""The account store and its inlined copies in the account servers"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import sync_account_store
+from account_store import UserStore
+
+
+@pytest.mark.parametrize('path', sync_account_store.SERVERS, ids=os.path.basename)
+def test_account_server_copy_is_up_to_date(path):
+    with open(path) as f:
+        content = f.read()
+    start, end = sync_account_store.current_block(content)
+    assert content[start:end] == sync_account_store.inlined_block(), 'run python sync_account_store.py'
+
+
+def test_accounts_persist_and_emails_stay_unique(tmp_path):
+    path = str(tmp_path / 'accounts.db')
+    store = UserStore(path)
+    assert store.add('a@example.com', {'name': 'A', 'email': 'a@example.com', 'password': 'hash'})
+    assert not store.add('a@example.com', {'name': 'B', 'email': 'a@example.com', 'password': 'other'})
+
+    reopened = UserStore(path)
+    assert len(reopened) == 1
+    assert reopened['a@example.com']['name'] == 'A'
+    assert 'b@example.com' not in reopened
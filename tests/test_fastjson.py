@@ -0,0 +1,55 @@
+"""Encoding Core rows with and without orjson"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import fastjson
+
+ROWS = [
+    (1, 'Ada, "A"', 91.5, datetime(2025, 3, 1, 9, 30, 0, 250000)),
+    (2, 'Bob\n', 70.0, datetime(2025, 3, 2, 10, 0)),
+    (3, None, 0.0, None),
+]
+
+
+@pytest.fixture
+def execute():
+    engine = sa.create_engine('sqlite://')
+    metadata = sa.MetaData()
+    table = sa.Table('t', metadata, sa.Column('id', sa.Integer, primary_key=True), sa.Column('name', sa.String),
+                     sa.Column('score', sa.Float), sa.Column('created_at', sa.DateTime))
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [dict(zip(('id', 'name', 'score', 'created_at'), row)) for row in ROWS])
+
+    def run():
+        with engine.connect() as conn:
+            result = conn.execute(sa.select(table).order_by(table.c.id))
+            return json.loads(fastjson.dumps({'rows': fastjson.records(
+                result, created_at=fastjson.isoformat, name=lambda name: name or 'Anonymous')}))
+    return run
+
+
+EXPECTED = [
+    {'id': 1, 'name': 'Ada, "A"', 'score': 91.5, 'created_at': '2025-03-01T09:30:00.250000'},
+    {'id': 2, 'name': 'Bob\n', 'score': 70.0, 'created_at': '2025-03-02T10:00:00'},
+    {'id': 3, 'name': 'Anonymous', 'score': 0.0, 'created_at': None},
+]
+
+
+def test_records_with_orjson(execute):
+    if fastjson.orjson is None:
+        pytest.skip('orjson is not installed')
+    assert execute() == {'rows': EXPECTED}
+
+
+def test_records_with_stdlib_json(execute, monkeypatch):
+    monkeypatch.setattr(fastjson, 'orjson', None)
+    assert execute() == {'rows': EXPECTED}
@@ -0,0 +1,36 @@
+"""GradeStatistics against the statistics module"""
+
+import importlib.util
+import os
+import random
+import statistics
+
+import pytest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture(scope='module')
+def v12():
+    spec = importlib.util.spec_from_file_location('grader_v12', os.path.join(REPO_ROOT, 'test grader v12.0.0.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_mode_ties_go_to_the_first_score_seen(v12):
+    assert v12.GradeStatistics([80, 90, 90, 80]).mode == statistics.mode([80, 90, 90, 80]) == 80
+
+
+def test_matches_statistics_module(v12):
+    rng = random.Random(42)
+    for _ in range(500):
+        scores = [rng.choice(range(60, 71)) for _ in range(rng.randint(2, 40))]
+        stats = v12.GradeStatistics(scores)
+        assert stats.mode == statistics.mode(scores)
+        assert stats.mean == pytest.approx(statistics.mean(scores))
+        assert stats.median == pytest.approx(statistics.median(scores))
+        assert stats.variance == pytest.approx(statistics.variance(scores))
+        cuts = statistics.quantiles(scores, n=100, method='inclusive')
+        for p in (10, 25, 50, 75, 90):
+            assert stats.percentile(p) == pytest.approx(cuts[p - 1])
@@ -0,0 +1,118 @@
+"""Saving and replaying a v13 course: the course file, its journal and the legacy JSON format"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('matplotlib')
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture(scope='module')
+def v13():
+    spec = importlib.util.spec_from_file_location('grader_v13', os.path.join(REPO_ROOT, 'test grader v13.0.0.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    # The calculator keeps its files in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def reopen(v13):
+    calc = v13.GradeCalculator('Course')
+    calc.load_data()
+    return calc
+
+
+def assignment_names(calc, student_id='S1', category='Homework'):
+    return [a['name'] for a in calc.students[student_id].categories[category].assignments]
+
+
+def test_course_file_and_journal_round_trip(v13):
+    calc = v13.GradeCalculator('Course')
+    student = v13.Student('Ada', 'S1')
+    homework = v13.GradeCategory('Homework', 60)
+    homework.add_assignment('a', 90, 100)
+    student.add_category(homework)
+    calc.add_student(student)
+    calc.save_data()
+
+    # Journaled after the snapshot
+    homework.add_assignment('b', 70, 100)
+    homework.weight = 50
+    exam = v13.GradeCategory('Exam', 50)
+    exam.add_assignment('final', 80, 100)
+    student.add_category(exam)
+    calc.add_student(v13.Student('Bob', 'S2'))
+    expected = student.calculate_final_grade()
+    calc.journal.close()
+
+    loaded = reopen(v13)
+    assert sorted(loaded.students) == ['S1', 'S2']
+    assert assignment_names(loaded) == ['a', 'b']
+    assert loaded.students['S1'].categories['Homework'].weight == 50
+    assert loaded.students['S1'].calculate_final_grade() == expected
+
+    # Replaying did not journal the changes a second time
+    loaded.journal.close()
+    assert assignment_names(reopen(v13)) == ['a', 'b']
+
+
+def test_torn_journal_tail_is_dropped(v13):
+    calc = v13.GradeCalculator('Course')
+    student = v13.Student('Ada', 'S1')
+    homework = v13.GradeCategory('Homework', 100)
+    homework.add_assignment('a', 90, 100)
+    student.add_category(homework)
+    calc.add_student(student)
+    calc.save_data()
+    homework.add_assignment('b', 80, 100)
+    calc.journal.close()
+    with open(calc.journal_file, 'ab') as f:
+        f.write(b'["assignment","S1","Homework","c",7')
+
+    loaded = reopen(v13)
+    loaded.students['S1'].categories['Homework'].add_assignment('d', 60, 100)
+    loaded.journal.close()
+    assert assignment_names(reopen(v13)) == ['a', 'b', 'd']
+
+
+def test_legacy_json_course_is_not_replayed_twice(v13):
+    with open('Course_grades.json', 'w') as f:
+        json.dump({'course_name': 'Course', 'students': {'S1': {'name': 'Ada', 'categories': {
+            'Homework': {'weight': 100, 'assignments': [{'name': 'a', 'score': 90, 'max_score': 100}]}}}}}, f)
+
+    calc = reopen(v13)
+    calc.students['S1'].categories['Homework'].add_assignment('b', 80, 100)
+    calc.save_json()
+    calc.journal.close()
+    assert assignment_names(reopen(v13)) == ['a', 'b']
+
+    # Changes after the JSON save are still replayed on top of it
+    calc = reopen(v13)
+    calc.students['S1'].categories['Homework'].add_assignment('c', 70, 100)
+    calc.journal.close()
+    assert assignment_names(reopen(v13)) == ['a', 'b', 'c']
+
+
+def test_categories_cannot_be_replaced_behind_the_cached_grade(v13):
+    student = v13.Student('Ada', 'S1')
+    homework = v13.GradeCategory('Homework', 100)
+    homework.add_assignment('a', 90, 100)
+    student.add_category(homework)
+    assert student.calculate_final_grade() == 90.0
+
+    replacement = v13.GradeCategory('Homework', 100)
+    replacement.add_assignment('b', 70, 100)
+    with pytest.raises(TypeError):
+        student.categories['Homework'] = replacement
+    student.add_category(replacement)
+    assert student.calculate_final_grade() == 70.0
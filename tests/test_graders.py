@@ -0,0 +1,40 @@
+"""Loading grader plugins through the graders registry"""
+
+import os
+import sys
+from importlib import metadata
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import graders
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A registry with nothing loaded or discovered yet"""
+    monkeypatch.setattr(graders, '_loaded', {})
+    monkeypatch.setattr(graders, '_entry_points', None)
+    return graders
+
+
+def test_builtin_plugin_is_loaded_on_first_use(registry):
+    assert 'v12.0.0' in registry.versions()
+    assert registry.loaded() == []
+    plugin = registry.get('v12.0.0')
+    assert plugin.version == 'v12.0.0'
+    assert plugin.grade(88.5) == ('B+', 'Very good!', 3.3)
+    assert registry.loaded() == ['v12.0.0']
+    assert registry.get('v12.0.0') is plugin
+
+
+def test_entry_point_plugin_is_loaded(registry, monkeypatch):
+    entry_point = metadata.EntryPoint('v99.0.0', 'graders.v14_0_0:grader', graders.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(graders, '_entry_points', {'v99.0.0': entry_point})
+    assert 'v99.0.0' in registry.versions()
+    assert registry.get('v99.0.0').grade(50) == ('F', 'Failed. Please seek help immediately!', 0.0)
+
+
+def test_unknown_version(registry):
+    assert registry.get('v0.0.0') is None
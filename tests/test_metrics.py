@@ -0,0 +1,28 @@
+"""Per-request phase timing"""
+
+import os
+import sys
+
+from flask import Flask, g
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metrics
+
+
+def test_timed_decorator_times_each_call_separately(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(metrics.time, 'perf_counter', lambda: clock[0])
+
+    @metrics.timed('work')
+    def work(depth):
+        clock[0] += 1
+        if depth:
+            # Overlaps the outer call, as a second thread would
+            work(depth - 1)
+
+    with Flask(__name__).test_request_context():
+        g.metrics_phases = {}
+        work(1)
+        # Outer call 0 -> 2, inner call 1 -> 2
+        assert g.metrics_phases['work'] == 3
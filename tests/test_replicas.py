@@ -0,0 +1,68 @@
+"""
+Read-replica routing against two SQLite files.
+
+The replica starts as a copy of the primary and then diverges: it holds one
+report the primary does not, so each response shows which database served it.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+REPLICA_ONLY = 'Replica Only'
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('replicas')
+    primary, replica = tmp / 'primary.db', tmp / 'replica.db'
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATABASE_URL', f'sqlite:///{primary}')
+        mp.setenv('DATABASE_REPLICA_URLS', f'sqlite:///{replica}')
+        import wed_view
+    wed_view.app.testing = True
+    wed_view.init_db()
+    with wed_view.app.app_context():
+        wed_view.db.engine.dispose()
+    shutil.copy(primary, replica)
+    with sqlite3.connect(replica) as conn:
+        server_id = conn.execute('SELECT id FROM grade_servers LIMIT 1').fetchone()[0]
+        conn.execute("INSERT INTO grade_reports (server_id, student_name, subject, score, letter_grade, gpa, created_at) "
+                     "VALUES (?, ?, 'General', 90, 'A', 4.0, datetime('now'))", (server_id, REPLICA_ONLY))
+    return wed_view.app
+
+
+def student_names(client):
+    response = client.get('/api/grades')
+    assert response.status_code == 200
+    return {grade['student_name'] for grade in response.get_json()['grades']}
+
+
+def test_read_replica_view_reads_the_replica(app):
+    assert REPLICA_ONLY in student_names(app.test_client())
+
+
+def test_reads_within_the_window_after_a_write_go_to_the_primary(app, monkeypatch):
+    import replicas
+
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': 'demo@testgrader.com', 'password': 'demo123456'})
+    assert response.status_code == 200
+    assert REPLICA_ONLY in student_names(client)
+
+    response = client.post('/api/grade', json={'score': 88, 'name': 'Fresh Write', 'subject': 'Math'})
+    assert response.status_code == 200
+    names = student_names(client)
+    assert 'Fresh Write' in names
+    assert REPLICA_ONLY not in names
+
+    # Once the window has passed the same user reads the replica again
+    monkeypatch.setattr(replicas, 'READ_YOUR_WRITES_SECONDS', 0)
+    names = student_names(client)
+    assert REPLICA_ONLY in names
+    assert 'Fresh Write' not in names
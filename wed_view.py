@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, send_file, g
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -6,7 +6,21 @@ from datetime import datetime
 import json
 import os
 import stripe
-from models import db, GradeReport, GradeServer, User as DbUser, ChatMessage
+from models import db, GradeReport, GradeServer, User as DbUser, ChatMessage, upgrade_schema
+import archive
+import replicas
+from replicas import read_replica
+import sketches
+import admission
+import metrics
+import sqlprofile
+from sqlprofile import query_budget
+import compression
+import claims
+import refdata
+from refdata import VERSION_CODES
+import graders
+from fastjson import json_response, records, isoformat
 
 app = Flask(__name__, template_folder='.', static_folder='.')
 CORS(app)
@@ -19,6 +33,16 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
 app.config['JSON_SORT_KEYS'] = False
 
 db.init_app(app)
+replicas.init_app(app)
+metrics.init_app(app)
+sqlprofile.init_app(app)
+admission.init_app(app)
+compression.init_app(app)
+claims.init_app(app)
+
+# Password hashing is deliberately slow; book it separately in request metrics
+generate_password_hash = metrics.timed('password_hash')(generate_password_hash)
+check_password_hash = metrics.timed('password_hash')(check_password_hash)
 
 # Initialize Stripe - fetch key from Replit connection
 def get_stripe_key():
@@ -51,15 +75,6 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'auth'
 
-# Version codes for console access
-VERSION_CODES = {
-    'GRADE10': 'v10.0.0',
-    'GRADE11': 'v11.0.0',
-    'GRADE12': 'v12.0.0',
-    'GRADE13': 'v13.0.0',
-    'GRADE14': 'v14.0.0'
-}
-
 # Flask-Login User class wrapper for database User model
 class User(UserMixin):
     def __init__(self, id, email, name, plan='free', stripe_customer_id=None):
@@ -71,9 +86,16 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user from database"""
+    """Load user from the session claim, or from the database when it is missing or stale"""
+    claim = claims.load(int(user_id))
+    if claim:
+        return User(claim['id'], claim['email'], claim['name'], claim['plan'] or 'free',
+                    claim['stripe_customer_id'])
     db_user = DbUser.query.get(int(user_id))
+    # Keep the row for current_db_user() so handlers don't query it again
+    g.db_user = db_user
     if db_user:
+        claims.issue(db_user)
         return User(
             db_user.id, 
             db_user.email, 
@@ -83,6 +105,12 @@ def load_user(user_id):
         )
     return None
 
+def current_db_user():
+    """Database row of the logged-in user, loaded at most once per request"""
+    if 'db_user' not in g:
+        g.db_user = DbUser.query.get(int(current_user.id))
+    return g.db_user
+
 # Grading system logic
 GRADE_SCALE = {
     97: ("A+", "Outstanding! Exceptional mastery!", 4.0),
@@ -107,11 +135,12 @@ def determine_grade(score):
             return GRADE_SCALE[threshold]
     return ("F", "Failed. Please seek help immediately!", 0.0)
 
-def save_grade_report(score, letter_grade, feedback, gpa, name="", subject="", server_id=1):
+def save_grade_report(score, letter_grade, feedback, gpa, name="", subject="", server_id=1, user_id=None):
     """Save grade report to database"""
     try:
         grade = GradeReport(
             server_id=server_id,
+            user_id=user_id,
             student_name=name or 'Anonymous',
             subject=subject or 'General',
             score=score,
@@ -127,6 +156,22 @@ def save_grade_report(score, letter_grade, feedback, gpa, name="", subject="", s
         db.session.rollback()
         return False
 
+# Columns of GradeReport.to_dict(), for list views that skip the ORM
+GRADE_REPORT_COLUMNS = (
+    GradeReport.id, GradeReport.student_name, GradeReport.subject, GradeReport.score,
+    GradeReport.letter_grade, GradeReport.feedback, GradeReport.gpa, GradeReport.created_at
+)
+
+def plan_or_free(plan):
+    return plan or 'free'
+
+def parse_date_arg(name):
+    """Parse an optional ISO date/datetime query argument (raises ValueError)"""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
 @app.route('/')
 def index():
     """Serve the homepage"""
@@ -207,6 +252,7 @@ def api_login():
             db_user.stripe_customer_id
         )
         login_user(user)
+        claims.issue(db_user)
         resp = jsonify({'success': True, 'message': 'Logged in successfully'})
         resp.headers['Content-Type'] = 'application/json'
         return resp
@@ -281,11 +327,13 @@ def api_logout():
     """Logout API endpoint"""
     if current_user.is_authenticated:
         logout_user()
+    claims.clear()
     response = jsonify({'success': True, 'message': 'Logged out successfully'})
     response.delete_cookie('code_verified')
     return response
 
 @app.route('/api/grade', methods=['POST'])
+@query_budget(3)
 def grade_test():
     """API endpoint to grade a test"""
     try:
@@ -301,15 +349,17 @@ def grade_test():
         if not 0 <= score <= 100:
             return jsonify({'error': 'Score must be between 0 and 100'}), 400
 
-        letter_grade, message, gpa = determine_grade(score)
+        # Each version grades with its own plugin, imported on first use
+        plugin = graders.get(version)
+        letter_grade, message, gpa = plugin.grade(score) if plugin else determine_grade(score)
 
         # Find the server by version
-        server = GradeServer.query.filter_by(version=version).first()
+        server = refdata.cache.server_by_version(version)
         if not server:
             return jsonify({'error': f'Version {version} not found'}), 400
 
         # Save to database with server_id
-        save_grade_report(score, letter_grade, message, gpa, name, subject, server.id)
+        save_grade_report(score, letter_grade, message, gpa, name, subject, server['id'], int(current_user.id))
 
         return jsonify({
             'success': True,
@@ -328,55 +378,109 @@ def grade_test():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/history', methods=['GET'])
+@query_budget(2)
 def get_history():
     """Get grade history from database"""
     try:
         if not current_user.is_authenticated:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        grades = GradeReport.query.order_by(GradeReport.created_at.desc()).all()
-        if not grades:
-            return jsonify({'history': 'No grade history found yet.', 'records': []})
-        return jsonify({
+        start = parse_date_arg('from')
+        end = parse_date_arg('to')
+        
+        user_id = int(current_user.id)
+        query = db.select(*GRADE_REPORT_COLUMNS).where(GradeReport.user_id == user_id)
+        if start:
+            query = query.where(GradeReport.created_at >= start)
+        if end:
+            query = query.where(GradeReport.created_at < end)
+        history = records(db.session.execute(query.order_by(GradeReport.created_at.desc())),
+                          created_at=isoformat)
+        
+        # Months detached by archive.py are read back from their compressed files
+        archived = list(archive.iter_archived(start, end, user_id))
+        if archived:
+            # A month whose delete failed after archiving has rows in both places
+            live_ids = {record['id'] for record in history}
+            for record in history:
+                # Archived records hold ISO strings; records() leaves datetimes to orjson
+                if isinstance(record['created_at'], datetime):
+                    record['created_at'] = record['created_at'].isoformat()
+            history.extend(record for record in archived if record['id'] not in live_ids)
+            history.sort(key=lambda r: r['created_at'] or '', reverse=True)
+        
+        if not history:
+            return json_response({'history': 'No grade history found yet.', 'records': []})
+        return json_response({
             'history': 'Grade Records',
-            'records': [g.to_dict() for g in grades]
+            'records': history
         })
+    except ValueError:
+        return jsonify({'error': 'Invalid date. Use YYYY-MM-DD'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admission-stats', methods=['GET'])
+def admission_stats():
+    """Get admission control counters"""
+    return jsonify(app.extensions['admission'].stats())
+
+def admission_metrics():
+    """Expose admission control counters alongside the request metrics"""
+    stats = app.extensions['admission'].stats()
+    lines = [
+        '# HELP admission_requests_total Requests admitted or shed by priority class',
+        '# TYPE admission_requests_total counter',
+    ]
+    for name, counts in stats['classes'].items():
+        for outcome, value in counts.items():
+            lines.append(f'admission_requests_total{{class="{name}",outcome="{outcome}"}} {value}')
+    lines += [
+        '# HELP admission_inflight Requests holding an admission slot',
+        '# TYPE admission_inflight gauge',
+        f"admission_inflight {stats['inflight']}",
+    ]
+    return lines
+
+metrics.REGISTRY.add_collector(admission_metrics)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus-style metrics"""
+    return metrics.metrics_response()
+
 @app.route('/api/servers', methods=['GET'])
+@query_budget(1)
 def get_servers():
     """Get all grade servers"""
     try:
-        servers = GradeServer.query.all()
         return jsonify({
-            'servers': [{
-                'id': s.id,
-                'version': s.version,
-                'port': s.port,
-                'status': s.status,
-                'created_at': s.created_at.isoformat()
-            } for s in servers]
+            'servers': list(refdata.cache.servers())
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/grades', methods=['GET'])
+@read_replica
+@query_budget(1)
 def get_grades():
     """Get all grade reports"""
     try:
-        grades = GradeReport.query.order_by(GradeReport.created_at.desc()).all()
-        return jsonify({
-            'grades': [g.to_dict() for g in grades]
+        result = db.session.execute(
+            db.select(*GRADE_REPORT_COLUMNS).order_by(GradeReport.created_at.desc()))
+        return json_response({
+            'grades': records(result, created_at=isoformat)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/stats', methods=['GET'])
+@read_replica
+@query_budget(4)
 def get_stats():
     """Get database statistics"""
     try:
-        server_count = GradeServer.query.count()
+        server_count = len(refdata.cache.servers())
         grade_count = GradeReport.query.count()
         
         avg_score = 0
@@ -473,9 +577,10 @@ def account_page():
 
 @app.route('/admin')
 @login_required
+@query_budget(1)
 def admin_page():
     """Serve the admin console page"""
-    db_user = DbUser.query.get(int(current_user.id))
+    db_user = current_db_user()
     if not db_user or not db_user.is_admin:
         return redirect(url_for('index'))
     try:
@@ -486,24 +591,20 @@ def admin_page():
 
 @app.route('/api/admin/users')
 @login_required
+@query_budget(2)
 def get_all_users():
     """Get all users - Admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
-        users = DbUser.query.order_by(DbUser.created_at.desc()).all()
-        return jsonify({
-            'users': [{
-                'id': u.id,
-                'name': u.name,
-                'email': u.email,
-                'phone': u.phone,
-                'plan': u.plan or 'free',
-                'is_admin': u.is_admin,
-                'created_at': u.created_at.isoformat() if u.created_at else None
-            } for u in users]
+        result = db.session.execute(db.select(
+            DbUser.id, DbUser.name, DbUser.email, DbUser.phone, DbUser.plan,
+            DbUser.is_admin, DbUser.created_at
+        ).order_by(DbUser.created_at.desc()))
+        return json_response({
+            'users': records(result, plan=plan_or_free, created_at=isoformat)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -513,7 +614,7 @@ def get_all_users():
 def admin_create_account():
     """Create a new account - Admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
@@ -561,7 +662,7 @@ def admin_create_account():
 def admin_delete_user(user_id):
     """Delete a user - Admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
@@ -581,13 +682,14 @@ def admin_delete_user(user_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/account')
+@query_budget(1)
 def get_account():
     """Get user account information"""
     try:
         if not current_user.is_authenticated:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if db_user:
             return jsonify({
                 'id': str(db_user.id),
@@ -607,7 +709,7 @@ def get_account():
 def cleanup_reports():
     """Clean up old grade reports - admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
@@ -625,12 +727,35 @@ def cleanup_reports():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/archive-reports', methods=['POST'])
+@login_required
+def archive_reports():
+    """Detach months older than the retention window into compressed archives - admin only"""
+    try:
+        db_user = current_db_user()
+        if not db_user or not db_user.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            retention = int(data.get('retention_months', archive.RETENTION_MONTHS))
+        except (TypeError, ValueError):
+            retention = 0
+        if retention < 1:
+            return jsonify({'error': 'retention_months must be a whole number of at least 1'}), 400
+        detached = archive.archive_old_reports(retention)
+        
+        return jsonify({'success': True, 'archived': detached, 'total': sum(detached.values())})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/compact-db', methods=['POST'])
 @login_required
 def compact_db():
     """Compact database - admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
@@ -641,10 +766,12 @@ def compact_db():
 
 @app.route('/api/db-stats')
 @login_required
+@read_replica
+@query_budget(5)
 def db_stats():
     """Get database statistics - admin only"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user or not db_user.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         
@@ -683,6 +810,7 @@ def chat_login():
         
         user = User(db_user.id, db_user.email, db_user.name, db_user.plan, db_user.stripe_customer_id)
         login_user(user)
+        claims.issue(db_user)
         
         return jsonify({'success': True, 'email': db_user.email, 'plan': db_user.plan})
     except Exception as e:
@@ -690,10 +818,11 @@ def chat_login():
 
 @app.route('/api/chat/messages')
 @login_required
+@query_budget(2)
 def get_chat_messages():
     """Get chat messages for current user"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -707,10 +836,11 @@ def get_chat_messages():
 
 @app.route('/api/chat/send', methods=['POST'])
 @login_required
+@query_budget(3)
 def send_chat_message():
     """Send a chat message"""
     try:
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -743,7 +873,7 @@ def verify_stripe_session():
         data = request.get_json()
         session_id = data.get('session_id')
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -783,7 +913,7 @@ def upgrade_to_pro():
         if not current_user.is_authenticated:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if db_user:
             db_user.plan = 'pro'
             db.session.commit()
@@ -800,7 +930,7 @@ def checkout_pro():
         if not current_user.is_authenticated:
             return jsonify({'error': 'Please log in first'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
             
@@ -873,7 +1003,7 @@ def check_pro_access(resource):
         if not current_user.is_authenticated:
             return jsonify({'access': False, 'reason': 'Not authenticated'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if db_user:
             user_plan = db_user.plan or 'free'
             has_access = user_plan in ['pro', 'enterprise']
@@ -894,7 +1024,7 @@ def download_pdf():
         if not current_user.is_authenticated:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -910,7 +1040,7 @@ def download_pdf():
         from io import BytesIO
         
         # Get grade records
-        records = GradeReport.query.filter_by(user_id=current_user.id).all()
+        records = GradeReport.query.filter_by(user_id=db_user.id).order_by(GradeReport.created_at.desc()).all()
         
         # Create PDF in memory
         buffer = BytesIO()
@@ -938,7 +1068,7 @@ def download_pdf():
             textColor=colors.grey,
         )
         story.append(Paragraph(f'<b>Teacher:</b> {db_user.name}', info_style))
-        story.append(Paragraph(f'<b>Generated:</b> {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', info_style))
+        story.append(Paragraph(f'<b>Generated:</b> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', info_style))
         story.append(Paragraph(f'<b>Total Records:</b> {len(records)}', info_style))
         story.append(Spacer(1, 0.2*inch))
         
@@ -990,19 +1120,40 @@ def download_pdf():
             buffer,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'grades_report_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+            download_name=f'grades_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
         )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Time budget for the aggregate queries behind /api/advanced-analytics
+ANALYTICS_BUDGET_MS = int(os.environ.get('ANALYTICS_BUDGET_MS', '2000'))
+
+def apply_query_budget(budget_ms):
+    """Cap statement time for the rest of this transaction where the database supports it"""
+    from sqlalchemy import text
+    if db.session.get_bind(clause=text('')).dialect.name == 'postgresql':
+        db.session.execute(text(f'SET LOCAL statement_timeout = {int(budget_ms)}'))
+
+def trend_bucket(bucket):
+    """SQL expression truncating created_at to a day or week (weeks start Monday)"""
+    from sqlalchemy import func, text
+    dialect = db.session.get_bind(clause=text('')).dialect.name
+    if bucket == 'week':
+        if dialect == 'postgresql':
+            return func.date(func.date_trunc('week', GradeReport.created_at))
+        return func.date(GradeReport.created_at, 'weekday 0', '-6 days')
+    return func.date(GradeReport.created_at)
+
 @app.route('/api/advanced-analytics')
+@read_replica
+@query_budget(8)
 def advanced_analytics():
     """Get advanced analytics - Pro only"""
     try:
         if not current_user.is_authenticated:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        db_user = DbUser.query.get(int(current_user.id))
+        db_user = current_db_user()
         if not db_user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -1010,47 +1161,163 @@ def advanced_analytics():
         if user_plan not in ['pro', 'enterprise']:
             return jsonify({'error': 'Advanced analytics is a Pro feature. Upgrade to access this feature.'}), 403
         
-        # Return advanced analytics
-        grades = GradeReport.query.all()
-        if not grades:
+        start = parse_date_arg('from')
+        end = parse_date_arg('to')
+        bucket = request.args.get('bucket', 'day')
+        if bucket not in ('day', 'week'):
+            return jsonify({'error': 'bucket must be day or week'}), 400
+        budget_ms = min(int(request.args.get('budget_ms', ANALYTICS_BUDGET_MS)), ANALYTICS_BUDGET_MS)
+        
+        from sqlalchemy import func
+        from sqlalchemy.exc import OperationalError
+        
+        window = [GradeReport.user_id == db_user.id]
+        if start:
+            window.append(GradeReport.created_at >= start)
+        if end:
+            window.append(GradeReport.created_at < end)
+        
+        def aggregate(*columns):
+            return db.session.query(*columns).filter(*window)
+        
+        started = datetime.now()
+        apply_query_budget(budget_ms)
+        
+        # Every query below groups in the database, so cost grows with groups, not rows
+        count, avg_score, avg_gpa = aggregate(
+            func.count(GradeReport.id), func.avg(GradeReport.score), func.avg(GradeReport.gpa)
+        ).one()
+        if not count:
             return jsonify({
                 'percentile': {},
                 'trends': {},
+                'total_grades': 0,
                 'insights': 'No grade data available'
             })
         
-        from sqlalchemy import func
-        # Advanced stats
-        score_dist = db.session.query(
-            func.floor(GradeReport.score / 10),
-            func.count(GradeReport.id)
-        ).group_by(func.floor(GradeReport.score / 10)).all()
+        decile = func.floor(GradeReport.score / 10)
+        period = trend_bucket(bucket)
+        stages = [
+            ('grade_distribution', lambda: {
+                str(int(k) * 10): v
+                for k, v in aggregate(decile, func.count(GradeReport.id)).group_by(decile).all()
+            }),
+            ('letter_grades', lambda: dict(
+                aggregate(GradeReport.letter_grade, func.count(GradeReport.id))
+                .group_by(GradeReport.letter_grade).all()
+            )),
+            ('subjects', lambda: [
+                {'subject': subject, 'count': n, 'avg_score': float(score), 'avg_gpa': float(gpa)}
+                for subject, n, score, gpa in aggregate(
+                    GradeReport.subject, func.count(GradeReport.id),
+                    func.avg(GradeReport.score), func.avg(GradeReport.gpa)
+                ).group_by(GradeReport.subject).order_by(func.count(GradeReport.id).desc()).all()
+            ]),
+            ('servers', lambda: [
+                {'version': version, 'count': n, 'avg_score': float(score), 'avg_gpa': float(gpa)}
+                for version, n, score, gpa in aggregate(
+                    GradeServer.version, func.count(GradeReport.id),
+                    func.avg(GradeReport.score), func.avg(GradeReport.gpa)
+                ).join(GradeServer, GradeServer.id == GradeReport.server_id)
+                .group_by(GradeServer.version).order_by(GradeServer.version).all()
+            ]),
+            ('trends', lambda: {
+                'bucket': bucket,
+                'points': [
+                    {'period': str(p)[:10], 'count': n, 'avg_score': float(score)}
+                    for p, n, score in aggregate(
+                        period, func.count(GradeReport.id), func.avg(GradeReport.score)
+                    ).group_by(period).order_by(period).all()
+                ]
+            }),
+        ]
         
-        return jsonify({
-            'grade_distribution': {str(k*10): v for k, v in score_dist},
-            'total_grades': len(grades),
+        result = {
+            'total_grades': count,
+            'avg_score': float(avg_score),
+            'avg_gpa': float(avg_gpa),
+            'window': {'from': start.isoformat() if start else None, 'to': end.isoformat() if end else None},
+            'budget_exceeded': False,
             'insights': 'Advanced analytics available with Pro plan'
-        })
+        }
+        for name, run in stages:
+            if (datetime.now() - started).total_seconds() * 1000 > budget_ms:
+                result['budget_exceeded'] = True
+                break
+            try:
+                result[name] = run()
+            except OperationalError:
+                # PostgreSQL cancelled the statement at the budget; return what we have
+                db.session.rollback()
+                result['budget_exceeded'] = True
+                break
+        result['query_ms'] = round((datetime.now() - started).total_seconds() * 1000, 1)
+        return jsonify(result)
+    except ValueError:
+        return jsonify({'error': 'Invalid date or budget value'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analytics/percentiles')
+@read_replica
+@query_budget(3)
+def percentile_analytics():
+    """Approximate score percentiles per server/subject/window - Pro only"""
+    try:
+        if not current_user.is_authenticated:
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        db_user = current_db_user()
+        if not db_user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        user_plan = db_user.plan or 'free'
+        if user_plan not in ['pro', 'enterprise']:
+            return jsonify({'error': 'Advanced analytics is a Pro feature. Upgrade to access this feature.'}), 403
+        
+        server_id = None
+        version = request.args.get('server', '').strip()
+        if version:
+            server = refdata.cache.server_by_version(version)
+            if not server:
+                return jsonify({'error': f'Version {version} not found'}), 400
+            server_id = server['id']
+        subject = request.args.get('subject', '').strip() or None
+        
+        sketch = sketches.store.query(db_user.id, server_id, subject, parse_date_arg('from'), parse_date_arg('to'))
+        result = {
+            'count': sketch.count,
+            'percentiles': sketch.percentiles(),
+            'error_bound': sketch.error_bound
+        }
+        score = request.args.get('score', '').strip()
+        if score:
+            result['percentile_rank'] = sketch.percentile_rank(float(score))
+        return jsonify(result)
+    except ValueError:
+        return jsonify({'error': 'Invalid score or date value'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/users')
+@query_budget(1)
 def get_users():
     """Get all user accounts from database (secure - no passwords shown)"""
     try:
-        users = DbUser.query.all()
-        return jsonify({
-            'users': [
-                {
-                    'id': str(user.id),
-                    'name': user.name,
-                    'email': user.email,
-                    'password': user.password_hash[:30] + '...' if user.password_hash else '',
-                    'plan': user.plan or 'free',
-                    'created_at': user.created_at.isoformat() if user.created_at else 'N/A'
-                }
-                for user in users
-            ]
+        # Only the first 30 characters of the hash ever leave the database
+        result = db.session.execute(db.select(
+            DbUser.id, DbUser.name, DbUser.email,
+            db.func.substr(DbUser.password_hash, 1, 30).label('password'),
+            DbUser.plan, DbUser.created_at
+        ))
+        return json_response({
+            'users': records(
+                result,
+                id=str,
+                password=lambda prefix: prefix + '...' if prefix else '',
+                plan=plan_or_free,
+                created_at=lambda created: created.isoformat() if created else 'N/A'
+            )
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1071,9 +1338,11 @@ def download_file(filename):
     except Exception as e:
         return f"Error: {str(e)}", 500
 
-if __name__ == '__main__':
+def init_db():
+    """Create tables, apply schema upgrades and seed the default servers and users"""
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         
         # Create default servers for all versions if they don't exist
         versions = [
@@ -1130,9 +1399,37 @@ if __name__ == '__main__':
                     print(f"Updated {user_data['email']} to admin")
         
         db.session.commit()
+        refdata.cache.load()
+
+def dispose_engines(close=True):
+    """Drop pooled database connections; with close=False, leave them to the parent process"""
+    with app.app_context():
+        db.engine.dispose(close=close)
+    for engine in app.extensions['replicas']['engines']:
+        engine.dispose(close=close)
+
+if __name__ == '__main__':
+    import argparse
+    import serve
+    
+    parser = argparse.ArgumentParser(description='Test Grader teacher console server')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', '1')),
+                        help='prefork this many worker processes (1 = development server)')
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('WEB_MAX_REQUESTS', '0')),
+                        help='replace a worker after this many requests (0 = never)')
+    args = parser.parse_args()
+    
+    init_db()
     
     print("🎓 Test Grader Teacher Console Server")
-    print("Starting server on http://0.0.0.0:5000")
+    print(f"Starting server on http://0.0.0.0:{args.port}")
     print("Open your browser and navigate to the server URL")
     print("Go to /auth for login/signup or /teacher for the console")
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    if args.workers > 1 or args.max_requests:
+        # Workers must not share the connections init_db() opened
+        dispose_engines()
+        serve.prefork(app, '0.0.0.0', args.port, args.workers, args.max_requests,
+                      post_fork=lambda: dispose_engines(close=False))
+    else:
+        app.run(host='0.0.0.0', port=args.port, debug=False)